@@ -14,6 +14,11 @@ from uml_types import (
     TypeString, TemplateArgs, TypeName
 )
 
+_RE_CV_QUALIFIERS = re.compile(r'\b(const|volatile|mutable)\b')
+_RE_TRAILING_EMPTY_BLOCK = re.compile(r'(>)\s*\{\s*\}\s*$')
+_RE_TRAILING_BLOCK = re.compile(r'\s*\{[^{}]*\}\s*$')
+_RE_TRAILING_STATEMENT = re.compile(r';[^\n]*$')
+
 
 class CppTypeParser:
     _CONTAINER_KEYWORDS: frozenset[str] = frozenset({
@@ -43,12 +48,15 @@ class CppTypeParser:
     @staticmethod
     def tokenize_type(s: Optional[str]) -> str:
         s = s or ""
-        s = re.sub(r'\b(const|volatile|mutable)\b', '', s)
-        s = re.sub(r'\s+', ' ', s).strip()
+        if 'const' in s or 'volatile' in s or 'mutable' in s:
+            s = _RE_CV_QUALIFIERS.sub('', s)
+        s = ' '.join(s.split())
         # Remove simple macro noise/trailing blocks like " > {}" or trailing braces
-        s = re.sub(r'(>)\s*\{\s*\}\s*$', r'\1', s)
-        s = re.sub(r'\s*\{[^{}]*\}\s*$', '', s)
-        s = re.sub(r';[^\n]*$', '', s)
+        if '{' in s:
+            s = _RE_TRAILING_EMPTY_BLOCK.sub(r'\1', s)
+            s = _RE_TRAILING_BLOCK.sub('', s)
+        if ';' in s:
+            s = _RE_TRAILING_STATEMENT.sub('', s)
         return s
 
     @staticmethod
@@ -82,6 +90,9 @@ class CppTypeParser:
         s: str = CppTypeParser.tokenize_type(type_str)
         if not s:
             return (s, [])
+        # Most type strings are not template instances
+        if '<' not in s:
+            return (s, [])
         if s.startswith('decltype(') and s.endswith(')'):
             return (s, [])
         depth: int = 0
@@ -171,9 +182,14 @@ class CppTypeParser:
         return spec_base == base_template
 
     @staticmethod
-    def match_known_types_from_parsed(parsed_list: List[TypeToken], known_names: Union[List[str], Tuple[str, ...], set[str]]) -> List[str]:
+    def match_known_types_from_parsed(parsed_list: List[TypeToken], known_names: Union[List[str], Tuple[str, ...], set[str], frozenset[str]]) -> List[str]:
         matched: List[str] = []
-        keys: List[str] = list(known_names)
+        # Sets are probed directly for exact matches (their iteration order is
+        # arbitrary anyway) and only listed once a suffix/template fallback needs it;
+        # ordered inputs keep first-match-wins and are never copied.
+        exact: Optional[Union[set[str], frozenset[str]]] = known_names if isinstance(known_names, (set, frozenset)) else None
+        keys: Optional[Union[List[str], Tuple[str, ...]]] = known_names if isinstance(known_names, (list, tuple)) else None
+        template_bases: Dict[str, str] = {}
         for item in parsed_list:
             token: str = item.get('name') or ''
             if not token:
@@ -190,19 +206,28 @@ class CppTypeParser:
                 candidates.append(f"{base_template}<...>")
             found: Optional[str] = None
             for c in candidates:
+                if exact is not None and c in exact:
+                    found = c
+                    break
+                suffix = "::" + c
+                c_base: Optional[str] = CppTypeParser.extract_template_base(c) if '<' in c else None
+                if keys is None:
+                    keys = list(known_names)
                 for kn in keys:
-                    if kn == c or kn.endswith("::" + c):
+                    if kn == c or kn.endswith(suffix):
                         found = kn
                         break
-                    if '<' in kn and '<' in c:
-                        kn_base = CppTypeParser.extract_template_base(kn)
-                        c_base = CppTypeParser.extract_template_base(c)
-                        if kn_base == c_base:
+                    if '<' in kn:
+                        if c_base is not None:
+                            kn_base = template_bases.get(kn)
+                            if kn_base is None:
+                                kn_base = template_bases[kn] = CppTypeParser.extract_template_base(kn)
+                            if kn_base == c_base:
+                                found = kn
+                                break
+                        elif c in kn:
                             found = kn
                             break
-                    elif '<' in kn and c in kn:
-                        found = kn
-                        break
                 if found:
                     break
             if found and found not in matched:
@@ -219,6 +244,10 @@ class CppTypeParser:
             out.extend(inner_tokens)
             out.append({'name': s, 'raw': s})
             return out
+        if '<' not in s:
+            if s and cls._is_valid_type_name(s):
+                out.append({'name': s, 'raw': s})
+            return out
         outer, args = cls.parse_template_args(s)
         if outer and cls._is_valid_type_name(outer):
             out.append({'name': outer, 'raw': outer})
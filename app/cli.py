@@ -22,6 +22,7 @@ from typing import Any
 from app.config import GeneratorConfig, DEFAULT_CONFIG
 import logging
 from utils.logging_config import configure_logging
+from utils.ids import use_legacy_ids
 
 
 def load_json(path: str) -> Any:
@@ -40,7 +41,7 @@ def load_json(path: str) -> Any:
 
 def parse_cli(argv: list[str], config: GeneratorConfig) -> tuple[str, str, str, GeneratorConfig]:
     if len(argv) < 4:
-        print("Usage: python -m app.cli <clang-uml.json> <out.uml> <out.notation> [--strict] [--no-template-binding] [--types-profile PATH] [--no-std-profile] [--list-phases] [--pretty]")
+        print("Usage: python -m app.cli <clang-uml.json> <out.uml> <out.notation> [--strict] [--no-template-binding] [--types-profile PATH] [--no-std-profile] [--list-phases] [--pretty] [--legacy-ids]")
         raise SystemExit(1)
     inp, out_uml, out_notation = argv[1:4]
     i = 4
@@ -70,6 +71,10 @@ def parse_cli(argv: list[str], config: GeneratorConfig) -> tuple[str, str, str,
             config.pretty_print = True
             i += 1
             continue
+        if arg == "--legacy-ids":
+            config.legacy_ids = True
+            i += 1
+            continue
         i += 1
     return inp, out_uml, out_notation, config
 
@@ -87,6 +92,7 @@ def main(argv: list[str] | None = None) -> int:
         inp, out_uml, out_notation, cfg = parse_cli(argv, DEFAULT_CONFIG)
     except SystemExit as e:
         return int(str(e)) if str(e).isdigit() else 1
+    use_legacy_ids(cfg.legacy_ids)
 
     # List phases if requested
     if "--list-phases" in argv:
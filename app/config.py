@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, List
 
 
@@ -24,7 +24,8 @@ class LayoutConfig:
 class DiagramConfig:
     diagram_name: str = "ClassDiagram"
     diagram_version: str = "2.0"
-    layout: LayoutConfig = LayoutConfig()
+    compact: bool = False              # stream the notation file without pretty printing
+    layout: LayoutConfig = field(default_factory=LayoutConfig)
 
 
 @dataclass
@@ -41,10 +42,11 @@ class GeneratorConfig:
     enable_template_binding: bool = True
     strict_validation: bool = False
     pretty_print: bool = False
+    legacy_ids: bool = False                   # SHA-1 based ids as generated before the BLAKE2b switch
     types_profiles: Optional[List[str]] = None
     
     # Diagram settings (consolidated from config_diagram.py)
-    diagram: DiagramConfig = DiagramConfig()
+    diagram: DiagramConfig = field(default_factory=DiagramConfig)
     
     # Association policy  
     allow_owned_end: bool = True
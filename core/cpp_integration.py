@@ -60,8 +60,8 @@ class EnhancedUmlElement(UmlElement):
 class CppEnhancedModelBuilder:
     """🚨 FALLBACK: Enhanced model builder with C++ metadata processing"""
     
-    def __init__(self, profile_registry: Optional[CppProfileRegistry] = None):
-        self.converter = BidirectionalConverter(profile_registry)
+    def __init__(self, profile_registry: Optional[CppProfileRegistry] = None, preserve_raw_data: bool = True):
+        self.converter = BidirectionalConverter(profile_registry, preserve_raw_data=preserve_raw_data)
         self.profile_registry = profile_registry or CppProfileRegistry()
         
     def build_enhanced_model(self, raw_elements: Dict[ElementName, Dict[str, Any]]) -> UmlModel:
@@ -217,7 +217,7 @@ class CppAwareXmiGenerator:
         writer.write_element("ownedTemplateSignature", {"xmi:id": signature_id})
         
         for i, param in enumerate(template_data.uml_parameters):
-            param_id = stable_id(str(element.xmi) + f":param:{i}")
+            param_id = stable_id(f"{element.xmi}:param:{i}")
             param_attrs = {
                 "xmi:id": param_id,
                 "name": param.name
@@ -288,7 +288,7 @@ _default_config = CppEnhancedConfig()
 def get_enhanced_builder(config: Optional[CppEnhancedConfig] = None) -> CppEnhancedModelBuilder:
     """Factory function for enhanced model builder"""
     config = config or _default_config
-    return CppEnhancedModelBuilder(_default_profile_registry)
+    return CppEnhancedModelBuilder(_default_profile_registry, preserve_raw_data=config.preserve_raw_data)
 
 # ===============================================
 # MIGRATION & DEPRECATION WARNINGS
@@ -408,8 +408,10 @@ class CppProfileRegistry:
 class BidirectionalConverter:
     """Interface for bidirectional C++ ↔ UML conversion"""
     
-    def __init__(self, profile_registry: Optional[CppProfileRegistry] = None):
+    def __init__(self, profile_registry: Optional[CppProfileRegistry] = None, preserve_raw_data: bool = True):
         self.profiles = profile_registry or CppProfileRegistry()
+        # Keeping a copy of the raw clang-uml JSON per element is only needed for round-tripping
+        self.preserve_raw_data = preserve_raw_data
         
     def parse_cpp_element(self, raw_data: Dict[str, Any]) -> CppElement:
         """
@@ -458,7 +460,8 @@ class BidirectionalConverter:
         """Extract C++ metadata from raw JSON"""
         # 🚨 FALLBACK IMPLEMENTATION - Replace with clang-uml integration
         metadata = CppMetadata()
-        metadata.original_data = raw_data.copy()
+        if self.preserve_raw_data:
+            metadata.original_data = raw_data.copy()
         
         # Extract source location
         if source_loc := raw_data.get('source_location'):
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Tuple, Union, Any, TYPE_CHECKING
+from typing import List, Optional, Dict, Sequence, Tuple, Union, Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from uml_types.uml import InheritanceType
@@ -10,7 +10,7 @@ from uml_types import (
 )
 
 # ---------- Member structure ----------
-@dataclass
+@dataclass(slots=True)
 class UmlMember:
     name: str
     type_repr: Optional[str]
@@ -20,7 +20,7 @@ class UmlMember:
     multiplicity: Multiplicity = "1"
 
 # ---------- Operation structure ----------
-@dataclass
+@dataclass(slots=True)
 class UmlOperation:
     name: str
     return_type: Optional[str]
@@ -32,7 +32,7 @@ class UmlOperation:
     is_virtual: bool = False
 
 # ---------- Clang metadata ----------
-@dataclass
+@dataclass(slots=True)
 class ClangMetadata:
     is_abstract: bool = False
     is_enum: bool = False
@@ -47,7 +47,7 @@ class ClangMetadata:
     kind: Optional[str] = None
 
 # ---------- UML Element structure ----------
-@dataclass
+@dataclass(slots=True)
 class UmlElement:
     xmi: XmiId
     name: ElementName
@@ -56,9 +56,9 @@ class UmlElement:
     clang: ClangMetadata
     used_types: frozenset[TypeName]
     underlying: Optional[TypeName] = None
-    operations: List[UmlOperation] = None  # List of UmlOperation objects
-    templates: List[str] = None  # List of template parameter names
-    literals: List[str] = None  # List of enum literal names
+    operations: List[UmlOperation] = field(default_factory=list)  # List of UmlOperation objects
+    templates: List[str] = field(default_factory=list)  # List of template parameter names
+    literals: List[str] = field(default_factory=list)  # List of enum literal names
     namespace: Optional[str] = None  # Namespace for this element
     original_data: Optional[Dict[str, Any]] = None  # Store original raw data (structure may vary)
     # Extended fields for stub/template handling
@@ -67,6 +67,7 @@ class UmlElement:
     instantiation_args: List[XmiId] = field(default_factory=list)
     
     def __post_init__(self):
+        # Builders may still pass None explicitly
         if self.operations is None:
             self.operations = []
         if self.templates is None:
@@ -98,10 +99,11 @@ class UmlElement:
     @property
     def public_members(self) -> List[UmlMember]:
         """Get all public members."""
-        return [member for member in self.members if member.visibility == Visibility.PUBLIC]
+        public = Visibility.PUBLIC
+        return [member for member in self.members if member.visibility is public]
 
 # ---------- Association structure ----------
-@dataclass
+@dataclass(slots=True)
 class UmlAssociation:
     src: XmiId  # source element XMI ID
     tgt: XmiId  # target element XMI ID
@@ -113,7 +115,7 @@ class UmlAssociation:
     _end2_id: Optional[XmiId] = None
 
 # ---------- New: Generalization structure ----------
-@dataclass
+@dataclass(slots=True)
 class UmlGeneralization:
     """Represents inheritance relationship between UML elements."""
     child_id: XmiId  # Child element XMI ID
@@ -130,7 +132,7 @@ class UmlGeneralization:
             self.inheritance_type = InheritanceType.PUBLIC  # Default to public inheritance
 
 # ---------- Model returned by analyzer ----------
-@dataclass
+@dataclass(slots=True)
 class UmlModel:
     elements: TypedDict[XmiId, UmlElement]
     associations: TypedList[UmlAssociation]
@@ -138,6 +140,12 @@ class UmlModel:
     generalizations: TypedList[UmlGeneralization]  # Updated: Use UmlGeneralization objects
     name_to_xmi: TypedDict[ElementName, XmiId]  # name -> XMI ID mapping
     namespace_packages: Optional[TypedDict[str, XmiId]] = None  # NEW: namespace -> XMI ID mapping
+    # Optional lookup indexes for the query helpers below, only used after build_indexes()
+    _indexed: bool = field(default=False, init=False, repr=False, compare=False)
+    _by_kind: Dict[ElementKind, List[UmlElement]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _parent_ids: Dict[XmiId, List[XmiId]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _child_ids: Dict[XmiId, List[XmiId]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _assoc_neighbors: Dict[XmiId, List[XmiId]] = field(default_factory=dict, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Initialize model after creation."""
@@ -172,50 +180,92 @@ class UmlModel:
         xmi_id = self.name_to_xmi.get(name)
         return self.elements.get(xmi_id) if xmi_id else None
     
+    def build_indexes(self) -> None:
+        """Snapshot per-kind and relation lookup indexes for repeated queries.
+
+        Queries answer from the snapshot until invalidate_indexes() is called, so build it
+        only once the model is no longer mutated (or rebuild it after mutating).
+        """
+        by_kind: Dict[ElementKind, List[UmlElement]] = {}
+        for elem in self.elements.values():
+            by_kind.setdefault(elem.kind, []).append(elem)
+        parent_ids: Dict[XmiId, List[XmiId]] = {}
+        child_ids: Dict[XmiId, List[XmiId]] = {}
+        for gen in self.generalizations:
+            parent_ids.setdefault(gen.child_id, []).append(gen.parent_id)
+            child_ids.setdefault(gen.parent_id, []).append(gen.child_id)
+        neighbors: Dict[XmiId, Dict[XmiId, None]] = {}
+        for assoc in self.associations:
+            neighbors.setdefault(assoc.src, {})[assoc.tgt] = None
+            if assoc.tgt != assoc.src:
+                neighbors.setdefault(assoc.tgt, {})[assoc.src] = None
+        self._by_kind = by_kind
+        self._parent_ids = parent_ids
+        self._child_ids = child_ids
+        self._assoc_neighbors = {xmi: list(ids) for xmi, ids in neighbors.items()}
+        self._indexed = True
+
+    def invalidate_indexes(self) -> None:
+        """Drop the index snapshot; queries scan the model directly again."""
+        self._indexed = False
+        self._by_kind = {}
+        self._parent_ids = {}
+        self._child_ids = {}
+        self._assoc_neighbors = {}
+
+    def _parents_of(self, element_id: XmiId) -> Sequence[XmiId]:
+        if self._indexed:
+            return self._parent_ids.get(element_id, ())
+        return [gen.parent_id for gen in self.generalizations if gen.child_id == element_id]
+
+    def _children_of(self, element_id: XmiId) -> Sequence[XmiId]:
+        if self._indexed:
+            return self._child_ids.get(element_id, ())
+        return [gen.child_id for gen in self.generalizations if gen.parent_id == element_id]
+
+    def _neighbors_of(self, element_id: XmiId) -> Sequence[XmiId]:
+        if self._indexed:
+            return self._assoc_neighbors.get(element_id, ())
+        neighbors: Dict[XmiId, None] = {}
+        for assoc in self.associations:
+            if assoc.src == element_id:
+                neighbors[assoc.tgt] = None
+            elif assoc.tgt == element_id:
+                neighbors[assoc.src] = None
+        return list(neighbors)
+
     def get_elements_by_kind(self, kind: ElementKind) -> List[UmlElement]:
         """Get all elements of a specific kind."""
+        if self._indexed:
+            return list(self._by_kind.get(kind, ()))
         return [elem for elem in self.elements.values() if elem.kind == kind]
     
     def get_associated_elements(self, element_id: XmiId) -> List[UmlElement]:
         """Get all elements associated with the given element."""
-        associated_ids = set()
-        for assoc in self.associations:
-            if assoc.src == element_id:
-                associated_ids.add(assoc.tgt)
-            elif assoc.tgt == element_id:
-                associated_ids.add(assoc.src)
-        
-        return [self.elements[elem_id] for elem_id in associated_ids if elem_id in self.elements]
+        return [self.elements[elem_id] for elem_id in self._neighbors_of(element_id) if elem_id in self.elements]
     
     def get_parent_elements(self, element_id: XmiId) -> List[UmlElement]:
         """Get all parent elements for the given element."""
-        parent_ids = [gen.parent_id for gen in self.generalizations if gen.child_id == element_id]
-        return [self.elements[parent_id] for parent_id in parent_ids if parent_id in self.elements]
+        return [self.elements[parent_id] for parent_id in self._parents_of(element_id) if parent_id in self.elements]
     
     def get_child_elements(self, element_id: XmiId) -> List[UmlElement]:
         """Get all child elements for the given element."""
-        child_ids = [gen.child_id for gen in self.generalizations if gen.parent_id == element_id]
-        return [self.elements[child_id] for child_id in child_ids if child_id in self.elements]
+        return [self.elements[child_id] for child_id in self._children_of(element_id) if child_id in self.elements]
     
     def get_inheritance_hierarchy(self, element_id: XmiId) -> List[UmlElement]:
         """Get complete inheritance hierarchy for the given element (including ancestors)."""
-        hierarchy = []
-        current_id = element_id
+        hierarchy: List[UmlElement] = []
+        visited: set[XmiId] = set()
+        current_id: Optional[XmiId] = element_id
         
-        while current_id in self.elements:
-            current_element = self.elements[current_id]
-            hierarchy.append(current_element)
-            
-            # Find parent
-            parent_gens = [gen for gen in self.generalizations if gen.child_id == current_id]
-            if not parent_gens:
-                break
-                
-            current_id = parent_gens[0].parent_id
+        # The visited set guards against cyclic generalizations
+        while current_id in self.elements and current_id not in visited:
+            visited.add(current_id)
+            hierarchy.append(self.elements[current_id])
             
-            # Prevent infinite loops
-            if current_id in [elem.xmi for elem in hierarchy]:
-                break
+            # Follow the first parent only
+            parent_ids = self._parents_of(current_id)
+            current_id = parent_ids[0] if parent_ids else None
         
         return hierarchy
     
@@ -18,6 +18,7 @@ import sys, re, uuid, hashlib, json
 
 from build.cpp.builder import CppModelBuilder
 from utils.logging_config import configure_logging
+from utils.ids import use_legacy_ids
 from core.uml_model import UmlModel, ElementName, XmiId
 from gen.xmi.generator import XmiGenerator
 from gen.notation.writer import NotationWriter
@@ -53,6 +54,7 @@ class Cpp2UmlApp:
         self.config.output_notation = out_notation
 
     def run(self):
+        use_legacy_ids(self.config.legacy_ids)
         j = load_json(self.in_json)
         # Build using current configuration
         builder = CppModelBuilder(j, enable_template_binding=self.config.__dict__.get('enable_template_binding', True))
@@ -143,6 +145,11 @@ def _parse_cli(argv: list[str], config: GeneratorConfig) -> tuple[str, str, str,
             config.pretty_print = True
             i += 1
             continue
+        # ids compatible with files generated before the BLAKE2b switch
+        if arg == "--legacy-ids":
+            config.legacy_ids = True
+            i += 1
+            continue
         # association policy
         if arg == "--no-owned-end":
             config.allow_owned_end = False
@@ -171,6 +178,7 @@ def main():
         inp, out_uml, out_notation, cfg, language = _parse_cli(sys.argv, DEFAULT_CONFIG)
     except SystemExit as e:
         return int(str(e)) if str(e).isdigit() else 1
+    use_legacy_ids(cfg.legacy_ids)
 
     # Language-specific processing
     if language == "c":
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from lxml import etree
 
 from app.config import LayoutConfig, DiagramConfig, DEFAULT_CONFIG
 from meta import DEFAULT_META as NEW_DEFAULT_META
 from meta.uml_meta import UmlMetaModel as UmlModel
 from meta.default_model import MetaBundle as DiagramModel
-from utils.ids import stable_id
+from utils.ids import stable_id, stable_id_bytes
 from core.uml_model import UmlElement
 from uml_types import ElementKind
 
@@ -15,9 +15,17 @@ from uml_types import ElementAttributes
 
 ElementDict = Dict[Any, UmlElement]
 
+
 class NotationWriter:
+    _NODE_TYPE_BY_KIND: Dict[ElementKind, str] = {
+        ElementKind.ENUM: "Enumeration",
+        ElementKind.DATATYPE: "DataType",
+        ElementKind.TYPEDEF: "DataType",
+    }
+
     def __init__(self, created: ElementDict, out_notation: str,
-                 config: Optional[DiagramConfig] = None, model: Optional[DiagramModel] = None) -> None:
+                 config: Optional[DiagramConfig] = None, model: Optional[DiagramModel] = None,
+                 compact: Optional[bool] = None) -> None:
         self.created: ElementDict = created
         self.out_notation: str = out_notation
         if config is None:
@@ -29,42 +37,67 @@ class NotationWriter:
         self.layout: LayoutConfig = config.layout
         self.xml = model.xml
         self.uml = model.uml
+        self.compact: bool = config.compact if compact is None else compact
+        self._diagram_tag: str = f"{{{self.xml.notation_ns}}}Diagram"
 
     @staticmethod
     def kind_to_node_type(kind: ElementKind, uml_model: UmlModel) -> str:
-        if kind == ElementKind.ENUM:
-            return "Enumeration"
-        if kind in (ElementKind.DATATYPE, ElementKind.TYPEDEF):
-            return "DataType"
-        return "Class"
+        return NotationWriter._NODE_TYPE_BY_KIND.get(kind, "Class")
 
-    def write(self) -> None:
-        root_attrs: ElementAttributes = {
+    def _root_attrs(self) -> ElementAttributes:
+        return {
             self.xml.xmi_version: self.config.diagram_version,
             self.xml.xmi_id: stable_id("notation"),
             "name": self.config.diagram_name,
         }
-        diagram_el: etree._Element = etree.Element(
-            f"{{{self.xml.notation_ns}}}Diagram",
-            nsmap=self.xml.notation_nsmap,
-            attrib=root_attrs,
-        )
-        for idx, (_, info) in enumerate(self.created.items()):
-            x, y = self.layout.calculate_position(idx)
-            node_type = self.kind_to_node_type(info.kind, self.uml)
-            node_attrs: ElementAttributes = {
-                "type": node_type,
-                self.xml.xmi_id: stable_id(str(info.xmi) + ":node"),
-                "elementRef": str(info.xmi),
+
+    def _iter_node_attrs(self) -> Iterator[ElementAttributes]:
+        # Attribute names and constant values are resolved once per diagram.
+        xmi_id_attr = self.xml.xmi_id
+        width = str(self.layout.width)
+        height = str(self.layout.height)
+        calculate_position = self.layout.calculate_position
+        node_type_by_kind = self._NODE_TYPE_BY_KIND
+        for idx, info in enumerate(self.created.values()):
+            x, y = calculate_position(idx)
+            xmi = str(info.xmi)
+            yield {
+                "type": node_type_by_kind.get(info.kind, "Class"),
+                xmi_id_attr: stable_id_bytes(f"{xmi}:node".encode("utf-8")),
+                "elementRef": xmi,
                 "x": str(x),
                 "y": str(y),
-                "width": str(self.layout.width),
-                "height": str(self.layout.height),
+                "width": width,
+                "height": height,
             }
-            etree.SubElement(diagram_el, "children", attrib=node_attrs)
+
+    def write(self) -> None:
+        if self.compact:
+            self._write_streaming()
+            return
+        diagram_el: etree._Element = etree.Element(
+            self._diagram_tag,
+            nsmap=self.xml.notation_nsmap,
+            attrib=self._root_attrs(),
+        )
+        # Children are built detached and attached with a single extend().
+        make_element = etree.Element
+        children: List[etree._Element] = [make_element("children", attrib=attrs) for attrs in self._iter_node_attrs()]
+        diagram_el.extend(children)
         tree: etree.ElementTree = etree.ElementTree(diagram_el)
         tree.write(self.out_notation, pretty_print=True, xml_declaration=True, encoding="UTF-8")
 
+    def _write_streaming(self) -> None:
+        """Stream the diagram through lxml's incremental writer without building a tree (no pretty printing)."""
+        with etree.xmlfile(self.out_notation, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            with xf.element(self._diagram_tag, nsmap=self.xml.notation_nsmap, attrib=self._root_attrs()):
+                # Children open inside the diagram element, so they inherit its namespace declarations
+                element = xf.element
+                for attrs in self._iter_node_attrs():
+                    with element("children", attrib=attrs):
+                        pass
+
 __all__ = ["NotationWriter"]
 
 
@@ -5,25 +5,39 @@ Generates XMI files from UML model data.
 """
 
 import logging
-from typing import Dict, Any, List, Set, Optional, Union
+import sys
+from typing import Callable, Dict, Any, Iterable, List, Set, Optional, Tuple, Union
 from lxml import etree
 from adapters.clang_uml.parser import CppTypeParser
 from core.uml_model import (
-    UmlModel, UmlElement, UmlAssociation, ElementKind,
+    UmlModel, UmlElement, UmlAssociation, UmlGeneralization, ElementKind,
     ClangMetadata, XmiId, ElementName, UmlOperation
 )
-from gen.xmi.writer import XmiWriter
-from utils.ids import stable_id
-from utils.xml import xml_text
+from gen.xmi.writer import XmiWriter, OwnedAttributeRow
+from utils.ids import stable_id, stable_id_bytes
 from meta import DEFAULT_META as NEW_DEFAULT_META
 
 from uml_types import TypedDict
 
 logger = logging.getLogger(__name__)
 
+# Type names that never get a stub element / are not reported as undefined member types
+_BUILTIN_TYPE_NAMES = frozenset({'int', 'char', 'bool', 'float', 'double', 'void', 'string', 'std::string'})
+_UNCHECKED_MEMBER_TYPE_NAMES = _BUILTIN_TYPE_NAMES | {'long', 'short', 'unsigned', 'signed'}
+_EMPTY_USED_TYPES: frozenset = frozenset()
+
 
 class NamespaceTree(TypedDict):
-    __annotations__: Dict[str, Union[UmlElement, Dict[str, Any]]]
+    __annotations__: Dict[str, Union[UmlElement, "_NsNode"]]
+
+
+class _NsNode:
+    """Namespace entry of a NamespaceTree: child entries by short name and an optional fixed package id."""
+    __slots__ = ("children", "xmi_id")
+
+    def __init__(self, xmi_id: Optional[XmiId] = None) -> None:
+        self.children: Dict[str, Any] = {}
+        self.xmi_id: Optional[XmiId] = xmi_id
 
 
 class XmiElementVisitor:
@@ -50,120 +64,119 @@ class UmlXmiWritingVisitor(XmiElementVisitor):
         self.model = model
         self.elements_by_id = model.elements
         self._elements_by_id_str = {str(xid): el for xid, el in self.elements_by_id.items()}
+        # Generalizations grouped by child, so each class looks up its own instead of scanning all
+        self._gens_by_child: Dict[XmiId, List[UmlGeneralization]] = {}
+        for gen in model.generalizations or []:
+            self._gens_by_child.setdefault(gen.child_id, []).append(gen)
         self.property_enrichments: Dict[str, Dict[str, str]] = property_enrichments or {}
+        self._normalized_types: Dict[str, str] = {}
+        self._uml = NEW_DEFAULT_META.uml
+        self._class_type: str = self._uml.class_type
+        self._enum_type: str = self._uml.enum_type
+        self._datatype_type: str = self._uml.datatype_type
+        # Kinds without an entry (typedef, interface) are written as classes
+        self._dispatch: Dict[ElementKind, Callable[[UmlElement], None]] = {
+            ElementKind.CLASS: self.visit_class,
+            ElementKind.ENUM: self.visit_enum,
+            ElementKind.DATATYPE: self.visit_datatype,
+        }
 
     def _normalize_type_name(self, t: Optional[str]) -> str:
         if not t:
             return "void"
+        cached = self._normalized_types.get(t)
+        if cached is not None:
+            return cached
         try:
             analysis = CppTypeParser.analyze_type_expr(t)
             base = analysis.get("base") or t
             base = base.strip()
-            return base
         except Exception:
-            return t
+            base = t
+        self._normalized_types[t] = base
+        return base
 
     def _mangle_operation_signature(self, class_id: XmiId, op: 'UmlOperation') -> str:
         try:
             param_types = [self._normalize_type_name(pt) for _, pt in (op.parameters or [])]
             ret_type = self._normalize_type_name(op.return_type)
-            const_suffix = " const" if getattr(op, 'is_const', False) else ""
-            virt_suffix = " virtual" if getattr(op, 'is_virtual', False) else ""
+            const_suffix = " const" if op.is_const else ""
+            virt_suffix = " virtual" if op.is_virtual else ""
             sig = f"{op.name}({', '.join(param_types)}) -> {ret_type}{const_suffix}{virt_suffix}"
             return sig
         except Exception:
             return f"{op.name}()"
 
-    def _parse_template_instantiation(self, qualified_name: str) -> Optional[tuple[str, list[str]]]:
-        if '<' not in qualified_name or '>' not in qualified_name:
-            return None
-        base = qualified_name.split('<', 1)[0]
-        args_str = qualified_name[qualified_name.find('<') + 1: qualified_name.rfind('>')]
-        # split by top-level commas
-        args: list[str] = []
-        buf: list[str] = []
-        depth = 0
-        for ch in args_str:
-            if ch == '<':
-                depth += 1
-                buf.append(ch)
-            elif ch == '>':
-                depth -= 1
-                buf.append(ch)
-            elif ch == ',' and depth == 0:
-                arg = ''.join(buf).strip()
-                if arg:
-                    args.append(arg)
-                buf = []
-            else:
-                buf.append(ch)
-        last = ''.join(buf).strip()
-        if last:
-            args.append(last)
-        return base, args
-
     def visit_class(self, info: UmlElement) -> None:
         name: ElementName = info.name
         xmi: XmiId = info.xmi
         is_abstract: bool = bool(info.clang.is_abstract)
+        # Typed on str: ElementName() is an identity function at runtime, so wrapping keys only adds a call
+        name_to_xmi_get: Callable[[str], Optional[XmiId]] = self.name_to_xmi.get  # type: ignore[assignment]
+        writer = self.writer
 
         extra_attrs: Optional[Dict[str, str]] = None
-        if hasattr(info, 'templates') and info.templates:
+        if info.templates:
             extra_attrs = {"isTemplate": "true"}
 
-        short_name = str(name).split('::')[-1] if '::' in str(name) else str(name)
+        short_name = name.rpartition('::')[2]
 
-        uml_model = NEW_DEFAULT_META.uml
-        self.writer.start_packaged_element(xmi, uml_model.class_type, short_name, is_abstract=is_abstract, extra_attrs=extra_attrs)
+        writer.start_packaged_element(xmi, self._class_type, short_name, is_abstract=is_abstract, extra_attrs=extra_attrs)
 
         # DISABLED: Template signatures for EMF compatibility
         # EMF validator requires each template signature to have at least 1 parameter
         # Many C++ templates have complex/external parameters that can't be properly modeled
-        # For now, disable template signatures to ensure valid EMF XMI output
-        if False:  # Completely disable template signature generation
-            pass
-
-        generalizations = getattr(self.model, "generalizations", []) or []
-        for gen in generalizations:
-            if gen.child_id == xmi:
-                parent_exists = gen.parent_id in self.model.elements
-                if not parent_exists:
-                    logger.warning(f"Skip generalization for '{name}': parent id {gen.parent_id} not found")
-                    continue
-                self.writer.write_generalization(
-                    stable_id(str(gen.child_id) + ":gen"), 
-                    gen.parent_id,
-                    inheritance_type=gen.inheritance_type.value if gen.inheritance_type else "public",
-                    is_virtual=gen.is_virtual,
-                    is_final=gen.is_final
-                )
+        # For now, template signatures are not generated to ensure valid EMF XMI output
 
-        for m in info.members:
-            aid: str = stable_id(xmi + ":attr:" + m.name)
-            tref: Optional[XmiId] = self.name_to_xmi.get(ElementName(m.type_repr)) if m.type_repr else None
-            enr = self.property_enrichments.get(aid, {})
-            assoc_ref = enr.get('association')
-            opp_ref = enr.get('opposite')
-            self.writer.write_owned_attribute(
-                aid, m.name, visibility=m.visibility.value,
-                type_ref=tref, is_static=m.is_static,
-                association_ref=XmiId(assoc_ref) if assoc_ref else None,
-                opposite_ref=XmiId(opp_ref) if opp_ref else None,
+        # Repeated child->parent edges from the builder are written once
+        seen_parents: Set[XmiId] = set()
+        for gen in self._gens_by_child.get(xmi, ()):
+            if gen.parent_id in seen_parents:
+                continue
+            seen_parents.add(gen.parent_id)
+            parent_exists = gen.parent_id in self.model.elements
+            if not parent_exists:
+                logger.warning(f"Skip generalization for '{name}': parent id {gen.parent_id} not found")
+                continue
+            writer.write_generalization(
+                stable_id(str(gen.child_id) + ":gen"), 
+                gen.parent_id,
+                inheritance_type=gen.inheritance_type.value if gen.inheritance_type else "public",
+                is_virtual=gen.is_virtual,
+                is_final=gen.is_final
             )
 
+        # Members are flattened to plain rows and written in one batch
+        if info.members:
+            enrichments_get = self.property_enrichments.get
+            attr_prefix = xmi + ":attr:"
+            rows: List[OwnedAttributeRow] = []
+            for m in info.members:
+                aid: str = stable_id(attr_prefix + m.name)
+                type_repr = m.type_repr
+                tref: Optional[XmiId] = name_to_xmi_get(type_repr) if type_repr else None
+                enr = enrichments_get(aid)
+                rows.append((
+                    aid, m.name, m.visibility.value, tref, m.is_static,
+                    enr.get('association') if enr else None,
+                    enr.get('opposite') if enr else None,
+                ))
+            writer.write_owned_attributes(rows)
+
         # Emit operations with mangled names to make them distinguishable and ids stable
         seen_param_names: set[str] = set()
         for idx, op in enumerate(info.operations):
             mangled = self._mangle_operation_signature(xmi, op)
             # Add index to ensure unique ID even for operations with identical signatures  
-            op_id: str = stable_id(xmi + ":op:" + str(idx) + ":" + mangled)
+            op_id: str = stable_id_bytes(f"{xmi}:op:{idx}:{mangled}".encode("utf-8"))
             # Ensure distinguishable names even when parameter types are missing
             display_name = f"{mangled}#{op_id[-6:]}"
-            return_type_ref: Optional[XmiId] = self.name_to_xmi.get(ElementName(op.return_type)) if op.return_type else None
-            self.writer.start_owned_operation(op_id, display_name, visibility=op.visibility.value, is_static=op.is_static)
+            return_type_ref: Optional[XmiId] = name_to_xmi_get(op.return_type) if op.return_type else None
+            writer.start_owned_operation(op_id, display_name, visibility=op.visibility.value, is_static=op.is_static)
             if return_type_ref:
-                self.writer.write_operation_return_type(op_id, return_type_ref)
+                writer.write_operation_return_type(op_id, return_type_ref)
             seen_param_names.clear()
+            param_prefix: bytes = (op_id + ":param:").encode("utf-8")
             for i, (param_name, param_type) in enumerate(op.parameters):
                 if not isinstance(param_name, str) or not isinstance(param_type, str):
                     logging.warning(f"Skipping invalid parameter data: name={param_name}, type={param_type}")
@@ -177,39 +190,25 @@ class UmlXmiWritingVisitor(XmiElementVisitor):
                     param_name = f"{base_name}_{n}"
                     n += 1
                 seen_param_names.add(param_name)
-                param_id: str = stable_id(op_id + ":param:" + str(i) + ":" + param_name)
-                param_type_ref: Optional[XmiId] = self.name_to_xmi.get(ElementName(param_type)) if param_type else None
-                self.writer.write_owned_parameter(param_id, param_name, "in", param_type_ref)
-            self.writer.end_owned_operation()
-
-        # Emit template binding if this is an instantiation (by metadata or by name heuristic)
-        inst_of = getattr(info, 'instantiation_of', None)
-        inst_args = getattr(info, 'instantiation_args', []) or []
-        if not inst_of and '<' in str(info.name) and '>' in str(info.name):
-            parsed = self._parse_template_instantiation(str(info.name))
-            if parsed:
-                base_name, arg_names = parsed
-                base_id = self.name_to_xmi.get(ElementName(base_name))
-                if base_id:
-                    inst_of = base_id
-                    inst_args = [self.name_to_xmi.get(ElementName(a)) for a in arg_names]
-        # Skip template binding generation for EMF compatibility 
-        # Template bindings with invalid signature references cause EMF validation errors
-        if False:  # Disabled for EMF compatibility
-            pass
+                param_id: str = stable_id_bytes(param_prefix + f"{i}:{param_name}".encode("utf-8"))
+                param_type_ref: Optional[XmiId] = name_to_xmi_get(param_type) if param_type else None
+                writer.write_owned_parameter(param_id, param_name, "in", param_type_ref)
+            writer.end_owned_operation()
 
-        self.writer.end_packaged_element()
+        # Template bindings are not emitted for EMF compatibility: bindings with
+        # invalid signature references cause EMF validation errors
+
+        writer.end_packaged_element()
 
     def visit_enum(self, info: UmlElement) -> None:
         name: ElementName = info.name
         xmi: XmiId = info.xmi
         is_abstract: bool = bool(info.clang.is_abstract)
-        short_name = str(name).split('::')[-1] if '::' in str(name) else str(name)
-        uml_model = NEW_DEFAULT_META.uml
-        self.writer.start_packaged_element(xmi, uml_model.enum_type, short_name, is_abstract=is_abstract)
-        if hasattr(info, 'literals') and info.literals:
+        short_name = name.rpartition('::')[2]
+        self.writer.start_packaged_element(xmi, self._enum_type, short_name, is_abstract=is_abstract)
+        if info.literals:
             for lit in info.literals:
-                lit_id: str = stable_id(xmi + ":literal:" + lit)
+                lit_id: str = stable_id(f"{xmi}:literal:{lit}")
                 self.writer.write_enum_literal(lit_id, lit)
         self.writer.end_packaged_element()
 
@@ -217,23 +216,25 @@ class UmlXmiWritingVisitor(XmiElementVisitor):
         name: ElementName = info.name
         xmi: XmiId = info.xmi
         is_abstract: bool = bool(info.clang.is_abstract)
-        short_name = str(name).split('::')[-1] if '::' in str(name) else str(name)
-        uml_model = NEW_DEFAULT_META.uml
-        self.writer.start_packaged_element(xmi, uml_model.datatype_type, short_name, is_abstract=is_abstract)
+        short_name = name.rpartition('::')[2]
+        self.writer.start_packaged_element(xmi, self._datatype_type, short_name, is_abstract=is_abstract)
         # DataTypes may own attributes as well
-        for m in getattr(info, 'members', []) or []:
-            aid: str = stable_id(xmi + ":attr:" + m.name)
-            tref: Optional[XmiId] = self.name_to_xmi.get(ElementName(m.type_repr)) if m.type_repr else None
-            enr = self.property_enrichments.get(aid, {})
-            assoc_ref = enr.get('association')
-            self.writer.write_owned_attribute(
-                aid, m.name, visibility=m.visibility.value,
-                type_ref=tref, is_static=m.is_static,
-                association_ref=XmiId(assoc_ref) if assoc_ref else None,
-                opposite_ref=None,
-            )
+        # Typed on str: ElementName() is an identity function at runtime, so wrapping keys only adds a call
+        name_to_xmi_get: Callable[[str], Optional[XmiId]] = self.name_to_xmi.get  # type: ignore[assignment]
+        if info.members:
+            enrichments_get = self.property_enrichments.get
+            attr_prefix = xmi + ":attr:"
+            rows: List[OwnedAttributeRow] = []
+            for m in info.members:
+                aid: str = stable_id(attr_prefix + m.name)
+                type_repr = m.type_repr
+                tref: Optional[XmiId] = name_to_xmi_get(type_repr) if type_repr else None
+                enr = enrichments_get(aid)
+                assoc_ref = enr.get('association') if enr else None
+                rows.append((aid, m.name, m.visibility.value, tref, m.is_static, XmiId(assoc_ref) if assoc_ref else None, None))
+            self.writer.write_owned_attributes(rows)
         if info.underlying:
-            tref: Optional[XmiId] = self.name_to_xmi.get(ElementName(info.underlying))
+            tref: Optional[XmiId] = name_to_xmi_get(info.underlying)
             if tref:
                 self.writer.write_generalization(stable_id(xmi + ":gen"), tref)
         # Template binding emission for datatypes disabled
@@ -243,14 +244,14 @@ class UmlXmiWritingVisitor(XmiElementVisitor):
         """Generate XMI for Package element (build target)"""
         name: ElementName = info.name
         xmi: XmiId = info.xmi
-        short_name = str(name).split('::')[-1] if '::' in str(name) else str(name)
-        uml_model = NEW_DEFAULT_META.uml
+        short_name = name.rpartition('::')[2]
+        uml_model = self._uml
         
         # Start package element
         self.writer.start_packaged_element(xmi, uml_model.package_type, short_name)
         
         # Add stereotype application for build target
-        if hasattr(info, 'original_data') and info.original_data:
+        if info.original_data:
             build_data = info.original_data
             stereotype = build_data.get('stereotype', 'target')
             self._write_build_stereotype_application(xmi, stereotype, build_data)
@@ -261,14 +262,14 @@ class UmlXmiWritingVisitor(XmiElementVisitor):
         """Generate XMI for Artifact element (source file)"""
         name: ElementName = info.name
         xmi: XmiId = info.xmi
-        short_name = str(name).split('::')[-1] if '::' in str(name) else str(name)
-        uml_model = NEW_DEFAULT_META.uml
+        short_name = name.rpartition('::')[2]
+        uml_model = self._uml
         
         # Start artifact element
         self.writer.start_packaged_element(xmi, uml_model.artifact_type, short_name)
         
         # Add stereotype application for file
-        if hasattr(info, 'original_data') and info.original_data:
+        if info.original_data:
             file_data = info.original_data
             self._write_file_stereotype_application(xmi, file_data)
         
@@ -314,40 +315,64 @@ class XmiGenerator:
         self.elements_by_id: Dict[XmiId, UmlElement] = model.elements
         self._elements_by_id_str = {str(xid): el for xid, el in self.elements_by_id.items()}
 
-        self.created: Dict[ElementName, UmlElement] = {
-            name: model.elements[xmi]
-            for name, xmi in self.name_to_xmi.items()
-            if xmi in model.elements
-        }
-        self.xmi_to_name: Dict[XmiId, ElementName] = {xmi: name for name, xmi in self.name_to_xmi.items()}
-
-        if self.graph and hasattr(self.graph, "namespaces") and hasattr(self.graph, "elements_by_id"):
-            self.namespace_tree = self._build_tree_from_namespace_node(self.graph.namespaces, self.graph.elements_by_id)
-        else:
-            self.namespace_tree: NamespaceTree = self._build_namespace_tree(self.created)
+        # Both name indexes are filled in one pass over name_to_xmi. Their names are
+        # interned so probes with the interned referenced-type names compare by
+        # identity; the model's own dict and members are left untouched.
+        self.created: Dict[ElementName, UmlElement] = {}
+        self.xmi_to_name: Dict[XmiId, ElementName] = {}
+        elements = model.elements
+        intern = sys.intern
+        for name, xmi in self.name_to_xmi.items():
+            name = ElementName(intern(name))
+            self.xmi_to_name[xmi] = name
+            elem = elements.get(xmi)
+            if elem is not None:
+                self.created[name] = elem
+
+        # Split qualified names, shared by every namespace tree build
+        self._qname_parts: Dict[ElementName, Tuple[str, ...]] = {}
+        # Trees are built on first use (see namespace_tree / write())
+        self._graph_namespace_tree: Optional[NamespaceTree] = None
+        self._created_namespace_tree: Optional[NamespaceTree] = None
 
         self.all_referenced_type_names: Set[str] = self._collect_referenced_types()
         self._create_stub_elements()
         self._resolve_association_targets()
         self._cleanup_invalid_associations()
         self._ensure_association_types_materialized()
-        if self.graph and hasattr(self.graph, "namespaces") and hasattr(self.graph, "elements_by_id"):
+        if self._has_graph_namespaces():
             for name, elem in self.created.items():
                 if elem.xmi not in self.graph.elements_by_id:
                     self.graph.elements_by_id[elem.xmi] = elem
-            self.namespace_tree = self._build_tree_from_namespace_node(self.graph.namespaces, self.graph.elements_by_id)
-        else:
-            self.namespace_tree = self._build_namespace_tree(self.created)
         self._validate_model()
 
+    def _has_graph_namespaces(self) -> bool:
+        return bool(self.graph) and hasattr(self.graph, "namespaces") and hasattr(self.graph, "elements_by_id")
+
+    @property
+    def namespace_tree(self) -> NamespaceTree:
+        """Namespace tree from the graph when one was given, otherwise from the created elements."""
+        if self._has_graph_namespaces():
+            if self._graph_namespace_tree is None:
+                self._graph_namespace_tree = self._build_tree_from_namespace_node(self.graph.namespaces, self.graph.elements_by_id)
+            return self._graph_namespace_tree
+        return self._get_created_namespace_tree()
+
+    def _get_created_namespace_tree(self) -> NamespaceTree:
+        # created is final once __init__ returns, so the tree is built at most once
+        if self._created_namespace_tree is None:
+            self._created_namespace_tree = self._build_namespace_tree(self.created)
+        return self._created_namespace_tree
+
     def _ensure_association_types_materialized(self) -> None:
         # Ensure every association endpoint id exists as a created element
         present_ids = {elem.xmi for elem in self.created.values()}
-        for assoc in list(self.model.associations):
+        xmi_to_name_get = self.xmi_to_name.get
+        for assoc in self.model.associations:
             for end_id in (assoc.src, assoc.tgt):
                 if end_id not in present_ids:
                     # Try to find a name for this id
-                    end_name = self.xmi_to_name.get(end_id) if hasattr(self, 'xmi_to_name') else None
+                    end_name = xmi_to_name_get(end_id)
                     if not end_name:
                         end_name = ElementName(f"Type_{str(end_id)[-8:]}")
                     # Create a minimal DataType stub and add it to created and model.elements
@@ -364,8 +389,7 @@ class XmiGenerator:
                     )
                     self.created[end_name] = stub_element
                     self.model.elements[end_id] = stub_element
-                    if end_name not in self.name_to_xmi:
-                        self.name_to_xmi[end_name] = end_id
+                    self.name_to_xmi.setdefault(end_name, end_id)
                     present_ids.add(end_id)
                     logger.warning(f"Materialized association endpoint as DataType: id='{end_id}', name='{end_name}'")
 
@@ -374,10 +398,8 @@ class XmiGenerator:
             out: Dict[str, Any] = {}
             children = getattr(ns_node, 'children', {}) or {}
             for name, child in children.items():
-                out[name] = {'__namespace__': True, '__children__': rec(child)}
-                xmi_id = getattr(child, 'xmi_id', None)
-                if xmi_id:
-                    out[name]['__xmi_id__'] = xmi_id
+                ns_entry = out[name] = _NsNode(getattr(child, 'xmi_id', None) or None)
+                ns_entry.children = rec(child)
             elem_ids = getattr(ns_node, 'elements', []) or []
             for eid in elem_ids:
                 elem = elements_by_id.get(eid)
@@ -391,28 +413,36 @@ class XmiGenerator:
     def _build_namespace_tree(self, elements: Dict[ElementName, UmlElement]) -> NamespaceTree:
         tree: NamespaceTree = {}
         logger.info(f"Building namespace tree for {len(elements)} elements")
-        if hasattr(self.model, 'namespace_packages') and self.model.namespace_packages:
+        if self.model.namespace_packages:
             for namespace_name, namespace_xmi in self.model.namespace_packages.items():
-                tree[namespace_name] = {'__namespace__': True, '__children__': {}, '__xmi_id__': namespace_xmi}
+                tree[namespace_name] = _NsNode(namespace_xmi)
+        if not any('::' in q_name for q_name in elements):
+            # Flat model: every element sits at the root, in the same order the walk below would give
+            tree.update(elements)
+            return tree
+        qname_parts = self._qname_parts
+        intern = sys.intern
         for q_name, info in elements.items():
-            name_str = str(q_name)
-            if '::' not in name_str:
-                tree[name_str] = info
+            parts = qname_parts.get(q_name)
+            if parts is None:
+                name_str = str(q_name)
+                # Namespace segments repeat across names; interned, the tree walk compares them by identity
+                parts = qname_parts[q_name] = tuple(map(intern, name_str.split('::'))) if '::' in name_str else (name_str,)
+            if len(parts) == 1:
+                tree[parts[0]] = info
             else:
-                parts = name_str.split('::')
-                if len(parts) == 1:
-                    tree[name_str] = info
-                else:
-                    current: Dict[str, Any] = tree
-                    for part in parts[:-1]:
-                        if part not in current:
-                            current[part] = {'__namespace__': True, '__children__': {}}
-                        elif not isinstance(current[part], dict) or '__namespace__' not in current[part]:
-                            existing_element: UmlElement = current[part]  # type: ignore
-                            current[part] = {'__namespace__': True, '__children__': {}}
-                            current[part]['__children__']['__root__'] = existing_element  # type: ignore
-                        current = current[part]['__children__']  # type: ignore
-                    current[parts[-1]] = info
+                current: Dict[str, Any] = tree
+                for part in parts[:-1]:
+                    node = current.get(part)
+                    if node is None:
+                        node = current[part] = _NsNode()
+                    elif not isinstance(node, _NsNode):
+                        # An element already holds this name; it moves under the namespace as '__root__'
+                        existing_element: UmlElement = node
+                        node = current[part] = _NsNode()
+                        node.children['__root__'] = existing_element
+                    current = node.children
+                current[parts[-1]] = info
         return tree
 
     def _collect_referenced_types(self) -> Set[str]:
@@ -424,27 +454,19 @@ class XmiGenerator:
             base = base.strip()
             return base or None
 
-        all_referenced_type_names: Set[str] = set()
-        for _, info in self.created.items():
-            for m in info.members:
-                n = normalize(m.type_repr)
-                if n:
-                    all_referenced_type_names.add(n)
-            if hasattr(info, 'operations'):
-                for op in info.operations:
-                    if op.return_type:
-                        n = normalize(op.return_type)
-                        if n:
-                            all_referenced_type_names.add(n)
-                    for _, param_type in op.parameters:
-                        n = normalize(param_type)
-                        if n:
-                            all_referenced_type_names.add(n)
-            if hasattr(info, 'templates'):
-                for t in info.templates:
-                    n = normalize(t)
-                    if n:
-                        all_referenced_type_names.add(n)
+        # Gather raw type strings in a single traversal, then normalize each distinct one once
+        raw_types: Set[str] = set()
+        update = raw_types.update
+        intern = sys.intern
+        for info in self.created.values():
+            update(m.type_repr for m in info.members)
+            operations = info.operations
+            if operations:
+                update(op.return_type for op in operations)
+                update(param_type for op in operations for _, param_type in op.parameters)
+            update(info.templates)
+
+        all_referenced_type_names: Set[str] = set(map(intern, filter(None, map(normalize, raw_types))))
         return all_referenced_type_names
 
     def _final_materialize_any_missing_idrefs(self, out_path: str, writer: XmiWriter) -> None:
@@ -452,39 +474,39 @@ class XmiGenerator:
             parser = etree.XMLParser(remove_blank_text=True)
             tree = etree.parse(out_path, parser)
             root = tree.getroot()
-            xmi_ns = NEW_DEFAULT_META.xml.xmi_ns
-            ns = {"xmi": xmi_ns, "uml": NEW_DEFAULT_META.xml.uml_ns}
-            ids_present: set[str] = set(el.get(NEW_DEFAULT_META.xml.xmi_id) for el in root.xpath('//*[@xmi:id]', namespaces=ns))
+            xmi_id = NEW_DEFAULT_META.xml.xmi_id
+            ids_present: set[str] = set()
             referenced: set[str] = set()
-            # Collect common reference attributes
-            ref_attrs = ["type", "general", "client", "supplier", "association", "opposite"]
-            for attr in ref_attrs:
-                for el in root.xpath(f'//*[@{attr}]', namespaces=ns):
-                    val = el.get(attr)
+            # Common reference attributes plus xmi:idref (memberEnd, signature, etc.), gathered in one walk
+            ref_attrs = ("type", "general", "client", "supplier", "association", "opposite", NEW_DEFAULT_META.xml.xmi_idref)
+            for el in root.iter(etree.Element):
+                attrib = el.attrib
+                if not attrib:
+                    continue
+                el_id = attrib.get(xmi_id)
+                if el_id is not None:
+                    ids_present.add(el_id)
+                for attr in ref_attrs:
+                    val = attrib.get(attr)
                     if val:
                         referenced.add(val)
-            # xmi:idref occurrences (memberEnd, signature, etc.)
-            for el in root.xpath('//*[@xmi:idref]', namespaces=ns):
-                val = el.get(f'{{{xmi_ns}}}idref')
-                if val:
-                    referenced.add(val)
             missing = [mid for mid in referenced if mid and mid not in ids_present]
         except Exception:
             missing = []
         if not missing:
             return
         # Emit missing as DataType stubs under a dedicated package
-        ext_pkg_id = stable_id("package:ExternalTypes")
-        writer.start_package(ext_pkg_id, "ExternalTypes")
-        for mid in sorted(set(missing)):
-            try:
-                name = self.xmi_to_name.get(XmiId(mid)) if hasattr(self, 'xmi_to_name') else None
-            except Exception:
-                name = None
-            nm_s = str(name) if name else f"Type_{mid[-8:]}"
-            writer.start_packaged_element(XmiId(mid), NEW_DEFAULT_META.uml.datatype_type, nm_s)
-            writer.end_packaged_element()
-        writer.end_package()
+        self._write_external_type_stubs(writer, sorted(set(missing)))
+
+    def _write_external_type_stubs(self, writer: XmiWriter, type_ids: Iterable[str]) -> None:
+        """Write undeclared ids as DataType stubs inside the ExternalTypes package."""
+        datatype_type = NEW_DEFAULT_META.uml.datatype_type
+        xmi_to_name_get = self.xmi_to_name.get
+        with writer.package(stable_id("package:ExternalTypes"), "ExternalTypes"):
+            for mid in type_ids:
+                nm = xmi_to_name_get(XmiId(mid))
+                writer.start_packaged_element(XmiId(mid), datatype_type, str(nm) if nm else f"Type_{mid[-8:]}")
+                writer.end_packaged_element()
 
     def _create_stub_elements(self) -> None:
         from app.config import DEFAULT_CONFIG
@@ -494,39 +516,47 @@ class XmiGenerator:
         except Exception:
             emit_stubs = True
         logger.info(f"Creating stub elements for {len(self.all_referenced_type_names)} referenced types")
-        for type_name in self.all_referenced_type_names:
-            if type_name in self.created or ElementName(type_name) in self.name_to_xmi:
-                continue
-            if type_name in ['int', 'char', 'bool', 'float', 'double', 'void', 'string', 'std::string']:
-                continue
+        # Known and builtin names are filtered out before the loop; each stub only adds its own name
+        created = self.created
+        name_to_xmi = self.name_to_xmi
+        missing_type_names = [
+            type_name for type_name in self.all_referenced_type_names
+            if type_name not in created and type_name not in name_to_xmi and type_name not in _BUILTIN_TYPE_NAMES
+        ] if emit_stubs else []
+        # Stubs share one (never mutated) ClangMetadata and used_types set
+        stub_clang = ClangMetadata()
+        datatype_kind = ElementKind.DATATYPE
+        stubs_by_name: Dict[ElementName, UmlElement] = {}
+        for type_name in missing_type_names:
             # Generate a stable stub id strictly from the type name
-            if emit_stubs:
-                stub_id: XmiId = XmiId(stable_id(f"type:{type_name}"))
-                self.name_to_xmi[ElementName(type_name)] = stub_id
-                stub_element: UmlElement = UmlElement(
-                    xmi=stub_id,
-                    name=ElementName(type_name),
-                    kind=ElementKind.DATATYPE,
-                    members=[],
-                    clang=ClangMetadata(),
-                    used_types=frozenset(),
-                    underlying=None
-                )
-                self.created[ElementName(type_name)] = stub_element
-                # Ensure the stub is also visible via elements_by_id/model.elements
-                try:
-                    self.elements_by_id[stub_id] = stub_element
-                    self.model.elements[stub_id] = stub_element
-                    self._elements_by_id_str[str(stub_id)] = stub_element
-                except Exception:
-                    pass
+            stub_name = ElementName(type_name)
+            stubs_by_name[stub_name] = UmlElement(
+                xmi=XmiId(stable_id(f"type:{type_name}")),
+                name=stub_name,
+                kind=datatype_kind,
+                members=[],
+                clang=stub_clang,
+                used_types=_EMPTY_USED_TYPES,
+                underlying=None
+            )
+        if stubs_by_name:
+            name_to_xmi.update({name: stub.xmi for name, stub in stubs_by_name.items()})
+            created.update(stubs_by_name)
+            # Ensure the stubs are also visible via elements_by_id/model.elements (the same dict unless replaced)
+            stubs_by_id = {stub.xmi: stub for stub in stubs_by_name.values()}
+            self.elements_by_id.update(stubs_by_id)
+            if self.model.elements is not self.elements_by_id:
+                self.model.elements.update(stubs_by_id)
+            self._elements_by_id_str.update({str(xid): stub for xid, stub in stubs_by_id.items()})
 
         # Also materialize template instantiations referenced in member types
+        name_to_xmi_get: Callable[[str], Optional[XmiId]] = self.name_to_xmi.get  # type: ignore[assignment]
+
         def ensure_instantiation_from_expr(expr: Dict[str, Any]) -> Optional[XmiId]:
             kind = expr.get("kind")
             if kind == "name":
                 nm = expr.get("name")
-                return self.name_to_xmi.get(ElementName(nm)) if nm else None
+                return name_to_xmi_get(nm) if nm else None
             if kind == "template":
                 base = expr.get("base") or ""
                 args = expr.get("args") or []
@@ -543,33 +573,31 @@ class XmiGenerator:
                 # Simple canonical name generation (data is now clean from build stage)
                 canonical = base + ("<" + ", ".join(arg_names) + ">" if arg_names else "")
                 inst_name = ElementName(canonical)
-                inst_xmi: Optional[XmiId] = self.name_to_xmi.get(inst_name)
-                if not inst_xmi:
-                    inst_id: XmiId = XmiId(stable_id(f"inst:{canonical}"))
-                    of_id: Optional[XmiId] = self.name_to_xmi.get(ElementName(base))
-                    if not of_id:
-                        return None
-                    inst_elem: UmlElement = UmlElement(
-                        xmi=inst_id,
-                        name=inst_name,
-                        kind=ElementKind.CLASS,
-                        members=[],
-                        clang=ClangMetadata(),
-                        used_types=frozenset(),
-                        underlying=None,
-                    )
-                    inst_elem.instantiation_of = of_id
-                    inst_elem.instantiation_args = list(arg_ids)
-                    self.created[inst_name] = inst_elem
-                    self.name_to_xmi[inst_name] = inst_id
-                    self.elements_by_id[inst_id] = inst_elem
-                    self._elements_by_id_str[str(inst_id)] = inst_elem
-                    inst_xmi = inst_id
-                return inst_xmi
+                if inst_xmi := name_to_xmi_get(inst_name):
+                    return inst_xmi
+                if not (of_id := name_to_xmi_get(base)):
+                    return None
+                inst_id: XmiId = XmiId(stable_id(f"inst:{canonical}"))
+                inst_elem: UmlElement = UmlElement(
+                    xmi=inst_id,
+                    name=inst_name,
+                    kind=ElementKind.CLASS,
+                    members=[],
+                    clang=ClangMetadata(),
+                    used_types=frozenset(),
+                    underlying=None,
+                )
+                inst_elem.instantiation_of = of_id
+                inst_elem.instantiation_args = list(arg_ids)
+                self.created[inst_name] = inst_elem
+                self.name_to_xmi[inst_name] = inst_id
+                self.elements_by_id[inst_id] = inst_elem
+                self._elements_by_id_str[str(inst_id)] = inst_elem
+                return inst_id
             return None
 
         for _, info in list(self.created.items()):
-            for m in getattr(info, 'members', []) or []:
+            for m in info.members:
                 if not m.type_repr:
                     continue
                 try:
@@ -579,20 +607,13 @@ class XmiGenerator:
                     continue
 
     def _resolve_association_targets(self) -> None:
+        # Ids of created elements, directly or via a name that maps to a created element
+        created = self.created
+        known_xmi_ids: Set[XmiId] = {info.xmi for info in created.values()}
+        known_xmi_ids.update(xmi_id for name, xmi_id in self.name_to_xmi.items() if name in created)
         for assoc in self.model.associations:
-            if assoc.tgt not in [info.xmi for info in self.created.values()]:
-                target_found = False
-                for _, info in self.created.items():
-                    if info.xmi == assoc.tgt:
-                        target_found = True
-                        break
-                if not target_found:
-                    for name, xmi_id in self.name_to_xmi.items():
-                        if xmi_id == assoc.tgt and name in self.created:
-                            target_found = True
-                            break
-                if not target_found:
-                    logger.warning(f"Association '{assoc.name}' has unresolved target: {assoc.tgt}")
+            if assoc.tgt not in known_xmi_ids:
+                logger.warning(f"Association '{assoc.name}' has unresolved target: {assoc.tgt}")
 
     def _cleanup_invalid_associations(self) -> None:
         valid_associations: List[UmlAssociation] = []
@@ -609,11 +630,11 @@ class XmiGenerator:
             if (assoc.src == assoc.tgt and 
                 assoc._end1_id and assoc._end2_id and 
                 assoc._end1_id == assoc._end2_id):
-                logger.debug(f"Skipping self-referential association: {assoc.name}")
+                logger.debug("Skipping self-referential association: %s", assoc.name)
                 continue
             # 2. Skip associations where either end ID is None/empty (would create invalid memberEnd)
             if not assoc._end1_id or not assoc._end2_id:
-                logger.debug(f"Skipping association with missing end IDs: {assoc.name} (end1={assoc._end1_id}, end2={assoc._end2_id})")
+                logger.debug("Skipping association with missing end IDs: %s (end1=%s, end2=%s)", assoc.name, assoc._end1_id, assoc._end2_id)
                 continue
                 
             # Skip duplicate associations between same endpoints
@@ -622,7 +643,7 @@ class XmiGenerator:
             end_pair = tuple(sorted([end1, end2]))  # Sort to catch both directions
             
             if end_pair in seen_associations:
-                logger.debug(f"Skipping duplicate association: {assoc.name}")
+                logger.debug("Skipping duplicate association: %s", assoc.name)
                 continue  # Skip duplicate
                 
             seen_associations.add(end_pair)
@@ -631,70 +652,101 @@ class XmiGenerator:
         self.model.associations = valid_associations
 
     def _validate_model(self) -> None:
-        validation_errors: List[str] = []
+        # Validation only reports warnings; with warnings disabled there is nothing to do
+        if not logger.isEnabledFor(logging.WARNING):
+            return
+        warn = logger.warning
+        # Valid association end ids are gathered in the same pass as the element checks
+        valid_xmi_ids: Set[XmiId] = set()
+        add_valid_id = valid_xmi_ids.add
+        name_to_xmi = self.name_to_xmi
         for name, element in self.created.items():
+            add_valid_id(element.xmi)
             if not element.name:
-                validation_errors.append(f"Element {name} has no name")
+                warn("Element %s has no name", name)
             if not element.xmi:
-                validation_errors.append(f"Element {name} has no XMI ID")
+                warn("Element %s has no XMI ID", name)
             for member in element.members:
                 if member.type_repr:
-                    if member.type_repr in ['int', 'char', 'bool', 'float', 'double', 'void', 'string', 'std::string', 'long', 'short', 'unsigned', 'signed']:
+                    if member.type_repr in _UNCHECKED_MEMBER_TYPE_NAMES:
                         continue
-                    if ElementName(member.type_repr) not in self.name_to_xmi:
-                        validation_errors.append(f"Member {member.name} in {name} references undefined type: {member.type_repr}")
-        valid_xmi_ids = {element.xmi for element in self.created.values()}
+                    if member.type_repr not in name_to_xmi:
+                        warn("Member %s in %s references undefined type: %s", member.name, name, member.type_repr)
         for assoc in self.model.associations:
             if assoc.src not in valid_xmi_ids or assoc.tgt not in valid_xmi_ids:
-                validation_errors.append(f"Association '{assoc.name}' references undefined elements")
-        if validation_errors:
-            for error in validation_errors:
-                logger.warning(error)
+                warn("Association '%s' references undefined elements", assoc.name)
 
     def get_model_statistics(self) -> Dict[str, Any]:
+        # Kinds and flags are counted in a single pass over the created elements
+        classes = enums = datatypes = templates = stubs = 0
+        class_kind, enum_kind, datatype_kind = ElementKind.CLASS, ElementKind.ENUM, ElementKind.DATATYPE
+        for e in self.created.values():
+            kind = e.kind
+            if kind is class_kind:
+                classes += 1
+            elif kind is enum_kind:
+                enums += 1
+            elif kind is datatype_kind:
+                datatypes += 1
+            if e.templates:
+                templates += 1
+            if e.is_stub:
+                stubs += 1
         return {
             'total_elements': len(self.created),
-            'classes': len([e for e in self.created.values() if e.kind == ElementKind.CLASS]),
-            'enums': len([e for e in self.created.values() if e.kind == ElementKind.ENUM]),
-            'datatypes': len([e for e in self.created.values() if e.kind == ElementKind.DATATYPE]),
-            'templates': len([e for e in self.created.values() if hasattr(e, 'templates') and e.templates]),
+            'classes': classes,
+            'enums': enums,
+            'datatypes': datatypes,
+            'templates': templates,
             'associations': len(self.model.associations),
             'dependencies': len(self.model.dependencies),
-            'generalizations': len(getattr(self.model, 'generalizations', []) or []),
-            'stub_elements': sum(1 for e in self.created.values() if getattr(e, 'is_stub', False))
+            'generalizations': len(self.model.generalizations or []),
+            'stub_elements': stubs,
         }
 
     def _write_package_contents(self, visitor: UmlXmiWritingVisitor, tree: NamespaceTree, parent_name: str = "") -> None:
-        for name, item in tree.items():
-            if isinstance(item, dict) and item.get('__namespace__'):
-                package_name: str = f"{parent_name}::{name}" if parent_name else name
-                if '__xmi_id__' in item:
-                    package_id: str = str(item['__xmi_id__'])
+        writer = visitor.writer
+        start_package = writer.start_package
+        end_package = writer.end_package
+        dispatch_get = visitor._dispatch.get
+        visit_default = visitor.visit_class
+        # Iterative depth-first walk; every frame above the root is an open package
+        stack: List[tuple[Any, str]] = [(iter(tree.items()), parent_name)]
+        while stack:
+            items, parent = stack[-1]
+            for name, item in items:
+                if isinstance(item, _NsNode):
+                    package_name: str = f"{parent}::{name}" if parent else name
+                    if item.xmi_id is not None:
+                        package_id: str = str(item.xmi_id)
+                    else:
+                        package_id: str = stable_id(f"package:{package_name}")
+                    start_package(package_id, name)
+                    stack.append((iter(item.children.items()), package_name))
+                    break
                 else:
-                    package_id: str = stable_id(f"package:{package_name}")
-                visitor.writer.start_package(package_id, name)
-                children: Dict[str, Any] = item.get('__children__', {})  # type: ignore
-                self._write_package_contents(visitor, children, package_name)
-                visitor.writer.end_package()
+                    dispatch_get(item.kind, visit_default)(item)
             else:
-                if hasattr(item, 'kind'):
-                    if item.kind == ElementKind.CLASS:
-                        visitor.visit_class(item)
-                    elif item.kind == ElementKind.ENUM:
-                        visitor.visit_enum(item)
-                    elif item.kind == ElementKind.DATATYPE:
-                        visitor.visit_datatype(item)
-                    elif item.kind == ElementKind.PACKAGE:
-                        visitor.visit_package(item)
-                    elif item.kind == ElementKind.ARTIFACT:
-                        visitor.visit_artifact(item)
-                    else:
-                        visitor.visit_class(item)
+                stack.pop()
+                if stack:
+                    end_package()
 
     def write(self, out_path: str, project_name: str, pretty: bool = False) -> None:
-        namespace_tree: NamespaceTree = self._build_namespace_tree(self.created)
+        try:
+            self._write_document(out_path, project_name)
+        finally:
+            # Memoized ids are only reused within one run; drop them so they do not outlive the model
+            stable_id.cache_clear()
+        if pretty:
+            parser = etree.XMLParser(remove_blank_text=True)
+            tree = etree.parse(out_path, parser)
+            tree.write(out_path, encoding="utf-8", xml_declaration=True, pretty_print=True)
+
+    def _write_document(self, out_path: str, project_name: str) -> None:
+        namespace_tree: NamespaceTree = self._get_created_namespace_tree()
         with etree.xmlfile(out_path, encoding="utf-8") as xf:
             writer: XmiWriter = XmiWriter(xf, xml_model=NEW_DEFAULT_META.xml)
+            uml_model = NEW_DEFAULT_META.uml
             writer.start_doc(project_name, model_id="model_1")
             # Map только по имени свойства (строго)
             member_prop_by_owner_and_name: Dict[tuple[XmiId, str], str] = {}
@@ -705,9 +757,10 @@ class XmiGenerator:
             # Набор всех реально существующих property id, вычисленных по членам классов
             existing_property_ids: set[str] = set()
             for elem in self.model.elements.values():
-                if hasattr(elem, 'members') and elem.members:
+                if elem.members:
+                    attr_prefix = elem.xmi + ":attr:"
                     for m in elem.members:
-                        pid: str = stable_id(elem.xmi + ":attr:" + m.name)
+                        pid: str = stable_id(attr_prefix + m.name)
                         member_prop_by_owner_and_name[(elem.xmi, m.name)] = pid
                         owner_prop_to_member_name[(elem.xmi, pid)] = m.name
                         existing_property_ids.add(pid)
@@ -771,37 +824,26 @@ class XmiGenerator:
             except Exception:
                 do_emit_types = True
             if do_emit_types:
-                try:
-                    parser_pk = etree.XMLParser(remove_blank_text=True)
-                    tree_pk = etree.parse(out_path, parser_pk)
-                    root_pk = tree_pk.getroot()
-                    ns_pk = {"xmi": NEW_DEFAULT_META.xml.xmi_ns, "uml": NEW_DEFAULT_META.xml.uml_ns}
-                    present_ids = set(el.get(NEW_DEFAULT_META.xml.xmi_id) for el in root_pk.xpath('//*[@xmi:id]', namespaces=ns_pk))
-                except Exception:
-                    present_ids = set()
+                # The document is still open, so ask the writer what it emitted instead of re-parsing out_path
+                present_ids = writer.get_emitted_ids()
                 try:
                     referenced_type_ids = visitor.writer.get_referenced_type_ids()  # type: ignore[attr-defined]
                 except Exception:
                     referenced_type_ids = set()
                 missing_type_ids = [tid for tid in referenced_type_ids if tid and tid not in present_ids]
                 if missing_type_ids:
-                    ext_pkg_id = stable_id("package:ExternalTypes")
-                    writer.start_package(ext_pkg_id, "ExternalTypes")
-                    for mid in missing_type_ids:
-                        nm = self.xmi_to_name.get(XmiId(mid)) if hasattr(self, 'xmi_to_name') else None
-                        nm_s = str(nm) if nm else f"Type_{mid[-8:]}"
-                        writer.start_packaged_element(XmiId(mid), NEW_DEFAULT_META.uml.datatype_type, nm_s)
-                        writer.end_packaged_element()
-                    writer.end_package()
+                    self._write_external_type_stubs(writer, missing_type_ids)
+            log_debug = logger.isEnabledFor(logging.DEBUG)
             for assoc in self.model.associations:
                 # Association id and end property ids already precomputed; just write association
-                logger.debug(f"Writing association: name='{assoc.name}', src='{assoc.src}', tgt='{assoc.tgt}'")
+                if log_debug:
+                    logger.debug("Writing association: name='%s', src='%s', tgt='%s'", assoc.name, assoc.src, assoc.tgt)
                 # If a claimed class-owned property id was not actually emitted, drop it to force ownedEnd
                 if assoc._end1_id and str(assoc._end1_id) not in emitted_props:
                     assoc._end1_id = None
                 if assoc._end2_id and str(assoc._end2_id) not in emitted_props:
                     assoc._end2_id = None
-                writer.write_association(assoc, uml_model=NEW_DEFAULT_META.uml)
+                writer.write_association(assoc, uml_model=uml_model)
                 # Try to set opposites between class properties if both memberEnd properties exist and belong to different owners
                 try:
                     if assoc._end1_id and assoc._end2_id:
@@ -814,24 +856,29 @@ class XmiGenerator:
                             pass
                 except Exception:
                     pass
+            created_get: Callable[[str], Optional[UmlElement]] = self.created.get  # type: ignore[assignment]
+            name_to_xmi_get: Callable[[str], Optional[XmiId]] = self.name_to_xmi.get  # type: ignore[assignment]
+            write_dependency = writer.write_dependency
+            # A dependency id is derived from the (owner, type) pair, so repeated pairs are written once
+            seen_dependencies: Set[tuple[str, str]] = set()
+            # An owner's dependencies usually come in a run; the owner is resolved once per run, in input order
+            last_owner: Optional[str] = None
+            client_id: Optional[XmiId] = None
             for owner_q_name, typ in self.model.dependencies:
-                client_info: Optional[UmlElement] = self.created.get(ElementName(owner_q_name))
-                if not client_info:
+                dep_key = (owner_q_name, typ)
+                if dep_key in seen_dependencies:
+                    continue
+                seen_dependencies.add(dep_key)
+                if owner_q_name != last_owner:
+                    last_owner = owner_q_name
+                    client_info: Optional[UmlElement] = created_get(owner_q_name)
+                    client_id = client_info.xmi if client_info else None
+                if not client_id:
                     continue
-                client_id: XmiId = client_info.xmi
-                supplier_id: Optional[XmiId] = self.name_to_xmi.get(ElementName(typ))
+                supplier_id: Optional[XmiId] = name_to_xmi_get(typ)
                 if client_id and supplier_id:
-                    dep_id: str = stable_id(f"dep:{owner_q_name}:{typ}")
-                    xml_model = NEW_DEFAULT_META.xml
-                    attribs: Dict[str, str] = {
-                        xml_model.xmi_type: "uml:Dependency", 
-                        xml_model.xmi_id: dep_id,
-                        "name": f"dep_{xml_text(owner_q_name)}_to_{xml_text(typ)}",
-                        "client": client_id, 
-                        "supplier": supplier_id
-                    }
-                    dep_el: etree._Element = etree.Element("packagedElement", attrib=attribs, nsmap=xml_model.uml_nsmap)
-                    xf.write(dep_el)
+                    dep_id: str = stable_id_bytes(f"dep:{owner_q_name}:{typ}".encode("utf-8"))
+                    write_dependency(dep_id, f"dep_{owner_q_name}_to_{typ}", client_id, supplier_id)
             # Final post-pass (optional): ensure any id in @type exists
             do_emit_types_final = True
             try:
@@ -839,25 +886,11 @@ class XmiGenerator:
             except Exception:
                 do_emit_types_final = True
             if do_emit_types_final:
-                try:
-                    parser3 = etree.XMLParser(remove_blank_text=True)
-                    tree3 = etree.parse(out_path, parser3)
-                    root3 = tree3.getroot()
-                    ns3 = {"xmi": NEW_DEFAULT_META.xml.xmi_ns, "uml": NEW_DEFAULT_META.xml.uml_ns}
-                    ids_in_doc3 = set(el.get(NEW_DEFAULT_META.xml.xmi_id) for el in root3.xpath('//*[@xmi:id]', namespaces=ns3))
-                    type_targets3 = set(el.get('type') for el in root3.xpath('//*[@type]', namespaces=ns3))
-                    missing_final = [t for t in type_targets3 if t and t not in ids_in_doc3]
-                except Exception:
-                    missing_final = []
+                # Emitted ids include owned attribute ids, so membership is a set lookup
+                ids_in_doc3 = writer.get_emitted_ids()
+                missing_final = [t for t in writer.get_referenced_type_ids() if t and t not in ids_in_doc3]
                 if missing_final:
-                    ext_pkg_id4 = stable_id("package:ExternalTypes")
-                    writer.start_package(ext_pkg_id4, "ExternalTypes")
-                    for mid in missing_final:
-                        nm = self.xmi_to_name.get(XmiId(mid)) if hasattr(self, 'xmi_to_name') else None
-                        nm_s = str(nm) if nm else f"Type_{mid[-8:]}"
-                        writer.start_packaged_element(XmiId(mid), NEW_DEFAULT_META.uml.datatype_type, nm_s)
-                        writer.end_packaged_element()
-                    writer.end_package()
+                    self._write_external_type_stubs(writer, missing_final)
             # Final catch-all: any id referenced anywhere but not declared gets materialized as DataType
             from app.config import DEFAULT_CONFIG
             do_final_emit = True
@@ -872,23 +905,12 @@ class XmiGenerator:
                     idrefs = visitor.writer.get_referenced_idrefs()  # type: ignore[attr-defined]
                     missing_ids = [rid for rid in idrefs if rid not in emitted_ids]
                     if missing_ids:
-                        ext_pkg_id = stable_id("package:ExternalTypes")
-                        writer.start_package(ext_pkg_id, "ExternalTypes")
-                        for mid in sorted(set(missing_ids)):
-                            nm = self.xmi_to_name.get(XmiId(mid)) if hasattr(self, 'xmi_to_name') else None
-                            nm_s = str(nm) if nm else f"Type_{mid[-8:]}"
-                            writer.start_packaged_element(XmiId(mid), NEW_DEFAULT_META.uml.datatype_type, nm_s)
-                            writer.end_packaged_element()
-                        writer.end_package()
+                        self._write_external_type_stubs(writer, sorted(set(missing_ids)))
                 except Exception:
                     # Fallback to XML parse method (only if stubs enabled)
                     if DEFAULT_CONFIG.emit_referenced_type_stubs:
                         self._final_materialize_any_missing_idrefs(out_path, writer)
             writer.end_doc()
-        if pretty:
-            parser = etree.XMLParser(remove_blank_text=True)
-            tree = etree.parse(out_path, parser)
-            tree.write(out_path, encoding="utf-8", xml_declaration=True, pretty_print=True)
 
 __all__ = ["XmiGenerator"]
 
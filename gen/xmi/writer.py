@@ -1,4 +1,5 @@
-from typing import Any, Dict, Optional, List, Union, Protocol
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, List, Tuple, Union, Protocol
 import logging
 from lxml import etree
 
@@ -12,7 +13,12 @@ from uml_types import ContextStack, ElementAttributes
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# (aid, name, visibility, type_ref, is_static, association_ref, opposite_ref)
+OwnedAttributeRow = Tuple[str, str, str, Optional[XmiId], bool, Optional[XmiId], Optional[XmiId]]
+
 class XmiWriter:
+    _PARAMETER_DIRECTIONS = frozenset({"in", "out", "inout", "return"})
+
     def __init__(self, xf: etree.xmlfile, xml_model: Optional[NewXmlModel] = None) -> None:
         self.xf: etree.xmlfile = xf
         self._ctx_stack: ContextStack = []
@@ -25,6 +31,21 @@ class XmiWriter:
         if xml_model is None:
             xml_model = DEFAULT_META.xml  # type: ignore[assignment]
         self.config: NewXmlModel = xml_model  # type: ignore[assignment]
+        # Constant leading attributes of a dependency; copied and completed per dependency
+        self._dependency_attrs: ElementAttributes = {self.config.xmi_type: "uml:Dependency"}
+        # Association ownedEnd attributes in output order; the empty slots are filled per end
+        self._owned_end_attrs: ElementAttributes = {
+            self.config.xmi_type: "uml:Property",
+            self.config.xmi_id: "",
+            "name": "",
+            "visibility": "public",
+            "isOrdered": "false",
+            "isUnique": "true",
+            "isReadOnly": "false",
+            "aggregation": "none",
+            "type": "",
+            "association": "",
+        }
 
     def start_doc(self, model_name: str, model_id: str = "model_1") -> None:
         """Start XMI 2.1 document with proper namespaces."""
@@ -84,10 +105,7 @@ class XmiWriter:
         ctx: etree._Element = self.xf.element("packagedElement", nsmap=self.config.uml_nsmap, **attrs)
         ctx.__enter__()
         self._ctx_stack.append(ctx)
-        try:
-            self._emitted_ids.add(str(xmi_id))
-        except Exception:
-            pass
+        self._emitted_ids.add(str(xmi_id))
 
     def end_packaged_element(self) -> None:
         """End packaged element."""
@@ -104,23 +122,34 @@ class XmiWriter:
         })
         ctx.__enter__()
         self._ctx_stack.append(ctx)
-        try:
-            self._emitted_ids.add(str(package_id))
-        except Exception:
-            pass
+        self._emitted_ids.add(str(package_id))
 
     def end_package(self) -> None:
         """End a package element."""
         ctx: etree._Element = self._ctx_stack.pop()
         ctx.__exit__(None, None, None)
 
+    @contextmanager
+    def package(self, package_id: XmiId, name: str) -> Iterator[None]:
+        """Context-manager form of start_package()/end_package()."""
+        self.start_package(package_id, name)
+        try:
+            yield
+        finally:
+            self.end_package()
+
+    def _write_empty(self, tag: str, attrs: ElementAttributes) -> None:
+        """Stream an empty element; namespace declarations are inherited from the open parent."""
+        with self.xf.element(tag, attrib=attrs):
+            pass
+
     def write_owned_attribute(self, aid: str, name: str, visibility: str = "private", type_ref: Optional[XmiId] = None, is_static: bool = False, association_ref: Optional[XmiId] = None, opposite_ref: Optional[XmiId] = None) -> None:
         """Write owned attribute - XMI 2.1 compliant."""
         # XMI 2.1 compliant attributes
         attrs: ElementAttributes = {
             self.config.xmi_id: aid, 
             "name": xml_text(name), 
-            "visibility": xml_text(visibility),
+            "visibility": visibility,
             "isStatic": "false",  # Default value
             "isReadOnly": "false",  # Default value
             "isDerived": "false"   # Default value
@@ -130,31 +159,54 @@ class XmiWriter:
             attrs["isStatic"] = "true"
         if type_ref:
             attrs["type"] = str(type_ref)
-            try:
-                self._referenced_type_ids.add(str(type_ref))
-                self._referenced_idrefs.add(str(type_ref))
-            except Exception:
-                pass
+            self._referenced_type_ids.add(str(type_ref))
+            self._referenced_idrefs.add(str(type_ref))
         if association_ref:
             attrs["association"] = str(association_ref)
-            try:
-                self._referenced_idrefs.add(str(association_ref))
-            except Exception:
-                pass
+            self._referenced_idrefs.add(str(association_ref))
         if opposite_ref:
             attrs["opposite"] = str(opposite_ref)
-            try:
-                self._referenced_idrefs.add(str(opposite_ref))
-            except Exception:
-                pass
+            self._referenced_idrefs.add(str(opposite_ref))
             
-        el: etree._Element = etree.Element("ownedAttribute", attrib=attrs, nsmap=self.config.uml_nsmap)
-        self.xf.write(el)
-        try:
+        self._write_empty("ownedAttribute", attrs)
+        if aid:
+            self._emitted_property_ids.add(str(aid))
+            self._emitted_ids.add(str(aid))
+
+    def write_owned_attributes(self, rows: Iterable[OwnedAttributeRow]) -> None:
+        """Write a class's owned attributes in one pass; same output as repeated write_owned_attribute()."""
+        xmi_id = self.config.xmi_id
+        element = self.xf.element
+        add_type_id = self._referenced_type_ids.add
+        add_idref = self._referenced_idrefs.add
+        add_property_id = self._emitted_property_ids.add
+        add_emitted_id = self._emitted_ids.add
+        for aid, name, visibility, type_ref, is_static, association_ref, opposite_ref in rows:
+            attrs: ElementAttributes = {
+                xmi_id: aid,
+                "name": xml_text(name),
+                "visibility": visibility,
+                "isStatic": "true" if is_static else "false",
+                "isReadOnly": "false",
+                "isDerived": "false",
+            }
+            if type_ref:
+                type_ref = str(type_ref)
+                attrs["type"] = type_ref
+                add_type_id(type_ref)
+                add_idref(type_ref)
+            if association_ref:
+                attrs["association"] = str(association_ref)
+                add_idref(attrs["association"])
+            if opposite_ref:
+                attrs["opposite"] = str(opposite_ref)
+                add_idref(attrs["opposite"])
+            with element("ownedAttribute", attrib=attrs):
+                pass
             if aid:
-                self._emitted_property_ids.add(str(aid))
-        except Exception:
-            pass
+                aid = str(aid)
+                add_property_id(aid)
+                add_emitted_id(aid)
 
     def start_owned_operation(self, oid: str, name: str, visibility: str = "public", is_static: bool = False, is_abstract: bool = False) -> None:
         """Start owned operation - XMI 2.1 compliant."""
@@ -162,7 +214,7 @@ class XmiWriter:
         attrs: ElementAttributes = {
             self.config.xmi_id: oid, 
             "name": xml_text(name),
-            "visibility": xml_text(visibility),
+            "visibility": visibility,
             "isStatic": "false",      # Default value
             "isAbstract": "false",    # Default value
             "isQuery": "false"        # Default value
@@ -176,10 +228,7 @@ class XmiWriter:
         ctx: etree._Element = self.xf.element("ownedOperation", nsmap=self.config.uml_nsmap, **attrs)
         ctx.__enter__()
         self._ctx_stack.append(ctx)
-        try:
-            self._emitted_ids.add(str(oid))
-        except Exception:
-            pass
+        self._emitted_ids.add(str(oid))
 
     def end_owned_operation(self) -> None:
         """End owned operation."""
@@ -189,8 +238,7 @@ class XmiWriter:
     def write_owned_parameter(self, pid: str, name: str, direction: str = "in", type_ref: Optional[XmiId] = None, default_value: Optional[str] = None, is_ordered: bool = True, is_unique: bool = True) -> None:
         """Write owned parameter - XMI 2.1 compliant."""
         # Validate direction value for XMI 2.1
-        valid_directions = ["in", "out", "inout", "return"]
-        if direction not in valid_directions:
+        if direction not in self._PARAMETER_DIRECTIONS:
             logger.warning(f"Invalid parameter direction '{direction}', using 'in'")
             direction = "in"
         
@@ -199,8 +247,8 @@ class XmiWriter:
             self.config.xmi_id: pid,
             "name": xml_text(name),
             "direction": direction,
-            "isOrdered": str(is_ordered).lower(),
-            "isUnique": str(is_unique).lower()
+            "isOrdered": "true" if is_ordered else "false",
+            "isUnique": "true" if is_unique else "false"
         }
         
         if type_ref:
@@ -208,28 +256,22 @@ class XmiWriter:
         if default_value:
             attrs["defaultValue"] = xml_text(default_value)
             
-        el: etree._Element = etree.Element("ownedParameter", nsmap=self.config.uml_nsmap, **attrs)
-        self.xf.write(el)
-        try:
-            self._emitted_ids.add(str(pid))
-        except Exception:
-            pass
+        self._write_empty("ownedParameter", attrs)
+        self._emitted_ids.add(str(pid))
 
     def write_literal(self, lid: str, name: str) -> None:
         """Write literal - XMI 2.1 compliant."""
-        el: etree._Element = etree.Element("ownedLiteral", nsmap=self.config.uml_nsmap, **{
+        self._write_empty("ownedLiteral", {
             self.config.xmi_id: lid,
             "name": xml_text(name)
         })
-        self.xf.write(el)
 
     def write_enum_literal(self, lid: str, name: str) -> None:
         """Write enum literal - XMI 2.1 compliant."""
-        el: etree._Element = etree.Element("ownedLiteral", nsmap=self.config.uml_nsmap, **{
+        self._write_empty("ownedLiteral", {
             self.config.xmi_id: lid,
             "name": xml_text(name)
         })
-        self.xf.write(el)
 
     def write_operation_return_type(self, operation_id: XmiId, type_ref: XmiId) -> None:
         """Write operation return type - XMI 2.1 compliant.
@@ -247,8 +289,7 @@ class XmiWriter:
             "isUnique": "true"
         }
 
-        return_el: etree._Element = etree.Element("ownedParameter", nsmap=self.config.uml_nsmap, **return_attrs)
-        self.xf.write(return_el)
+        self._write_empty("ownedParameter", return_attrs)
 
     def start_template_signature(self, signature_id: str) -> None:
         """Start template signature - XMI 2.1 compliant."""
@@ -270,52 +311,29 @@ class XmiWriter:
 
     def write_template_parameter(self, template_id: str, parameter_name: str) -> None:
         """Write template parameter - XMI 2.1 compliant."""
-        el: etree._Element = etree.Element(
-            "ownedTemplateParameter",
-            nsmap=self.config.uml_nsmap,
-            **{
-                self.config.xmi_id: template_id,
-                self.config.xmi_type: "uml:TemplateParameter",
-                "name": xml_text(parameter_name),
-            },
-        )
-        self.xf.write(el)
+        self._write_empty("ownedTemplateParameter", {
+            self.config.xmi_id: template_id,
+            self.config.xmi_type: "uml:TemplateParameter",
+            "name": xml_text(parameter_name),
+        })
 
     def write_template_binding(self, binding_id: str, signature_ref: Optional[XmiId], arg_ids: List[XmiId]) -> None:
         """Write templateBinding with parameterSubstitution entries as a child of current element.
         If signature_ref is None, omit the 'signature' child (permissive mode).
         """
-        # Nest within current open packagedElement using xmlfile contexts
-        with self.xf.element(
-            "templateBinding",
-            nsmap=self.config.uml_nsmap,
-            **{
-                self.config.xmi_id: binding_id,
-                self.config.xmi_type: "uml:TemplateBinding",
-            },
-        ):
+        # Nest within current open packagedElement using xmlfile contexts; namespaces are inherited from it
+        xmi_id = self.config.xmi_id
+        xmi_idref = self.config.xmi_idref
+        element = self.xf.element
+        with element("templateBinding", attrib={xmi_id: binding_id, self.config.xmi_type: "uml:TemplateBinding"}):
             # signature reference (optional)
             if signature_ref is not None:
-                with self.xf.element(
-                    "signature",
-                    nsmap=self.config.uml_nsmap,
-                    **{self.config.xmi_idref: str(signature_ref)},
-                ):
-                    pass
+                self._write_empty("signature", {xmi_idref: str(signature_ref)})
 
             # substitutions
             for i, aid in enumerate(arg_ids):
-                with self.xf.element(
-                    "parameterSubstitution",
-                    nsmap=self.config.uml_nsmap,
-                    **{self.config.xmi_id: stable_id(binding_id + f":sub:{i}")},
-                ):
-                    with self.xf.element(
-                        "actual",
-                        nsmap=self.config.uml_nsmap,
-                        **{self.config.xmi_idref: str(aid)},
-                    ):
-                        pass
+                with element("parameterSubstitution", attrib={xmi_id: stable_id(f"{binding_id}:sub:{i}")}):
+                    self._write_empty("actual", {xmi_idref: str(aid)})
 
     def write_generalization(self, gid: str, general_ref: XmiId, inheritance_type: str = "public", is_virtual: bool = False, is_final: bool = False) -> None:
         """Write generalization element - XMI 2.1 compliant."""
@@ -334,13 +352,19 @@ class XmiWriter:
         if is_final:
             attrs["isFinalSpecialization"] = "true"
             
-        el: etree._Element = etree.Element("generalization", attrib=attrs, nsmap=self.config.uml_nsmap)
-        self.xf.write(el)
-        try:
-            self._referenced_idrefs.add(str(general_ref))
-            self._emitted_ids.add(str(gid))
-        except Exception:
-            pass
+        self._write_empty("generalization", attrs)
+        self._referenced_idrefs.add(str(general_ref))
+        self._emitted_ids.add(str(gid))
+
+    def write_dependency(self, dep_id: str, name: str, client: XmiId, supplier: XmiId) -> None:
+        """Write a uml:Dependency packaged element without building an Element."""
+        attrs = self._dependency_attrs.copy()
+        attrs[self.config.xmi_id] = dep_id
+        attrs["name"] = name
+        attrs["client"] = client
+        attrs["supplier"] = supplier
+        self._write_empty("packagedElement", attrs)
+        self._emitted_ids.add(dep_id)
 
     def write_association(self, assoc: UmlAssociation, uml_model: Optional[NewUmlModel] = None) -> None:
         """Write association - XMI 2.1 compliant."""
@@ -350,29 +374,14 @@ class XmiWriter:
         
         # Prefer precomputed stable ids (set earlier in XmiGenerator.write)
         aid: str = assoc._assoc_id or stable_id(f"assoc:{assoc.src}:{assoc.tgt}:{assoc.name}")
-        
-        # XMI 2.1 compliant association attributes
-        assoc_el: etree._Element = etree.Element(
-            "packagedElement",
-            attrib={
-                self.config.xmi_type: uml_model.association_type,
-                self.config.xmi_id: aid,
-                "name": xml_text(assoc.name or ""),
-                "visibility": "public"  # Default visibility for XMI 2.1
-            },
-            nsmap=self.config.uml_nsmap
-        )
-        try:
-            self._emitted_ids.add(aid)
-        except Exception:
-            pass
+        self._emitted_ids.add(aid)
 
         # Compute end ids (use precomputed if available)
         end1_id: str = assoc._end1_id or stable_id(aid + ":end1")
         end2_id: str = assoc._end2_id or stable_id(aid + ":end2")
 
-        def add_bound_value(parent: etree._Element, tag: str, value: str) -> None:
-            """Add lowerValue/upperValue with proper xmi:type for XMI 2.1."""
+        def write_bound_value(parent_id: str, tag: str, value: str) -> None:
+            """Write lowerValue/upperValue with proper xmi:type for XMI 2.1."""
             if value == "-1" or value == "*" or value.strip() == "*":
                 literal_type: str = uml_model.literal_unlimited_natural_type
                 literal_value: str = uml_model.unlimited_multiplicity
@@ -381,26 +390,30 @@ class XmiWriter:
                 literal_value: str = str(value)
                 
             # XMI 2.1 compliant bound value
-            bound_el = etree.SubElement(
-                parent, tag,
-                attrib={
-                    self.config.xmi_type: literal_type,
-                    self.config.xmi_id: stable_id(parent.get(self.config.xmi_id) + ":" + tag),
-                    "value": literal_value
-                },
-                nsmap=self.config.uml_nsmap
-            )
-            return bound_el
+            self._write_empty(tag, {
+                self.config.xmi_type: literal_type,
+                self.config.xmi_id: stable_id(f"{parent_id}:{tag}"),
+                "value": literal_value
+            })
+
+        def write_owned_end(end_id: str, name: str, type_ref: str) -> None:
+            attrs = self._owned_end_attrs.copy()
+            attrs[self.config.xmi_id] = end_id
+            attrs["name"] = name
+            attrs["type"] = type_ref
+            attrs["association"] = aid
+            with self.xf.element("ownedEnd", attrib=attrs):
+                write_bound_value(end_id, "lowerValue", "1")
+                write_bound_value(end_id, "upperValue", "1")
+            if end_id:
+                self._emitted_property_ids.add(str(end_id))
+                self._emitted_ids.add(str(end_id))
 
         # For UML2 5.x: Prefer class-owned Property ids when provided.
         # If not provided, create ownedEnd Properties under the Association and reference them
         # only when allowed by configuration.
         from app.config import DEFAULT_CONFIG
-        allow_owned = True
-        try:
-            allow_owned = DEFAULT_CONFIG.allow_owned_end
-        except Exception:
-            pass
+        allow_owned: bool = getattr(DEFAULT_CONFIG, "allow_owned_end", True)
         create_owned_end1: bool = False
         create_owned_end2: bool = False
         if not assoc._end1_id:
@@ -420,136 +433,48 @@ class XmiWriter:
             end1_id = stable_id(aid + ":ownedEnd1")
             end2_id = stable_id(aid + ":ownedEnd2")
 
-        if create_owned_end1:
-            # ownedEnd 1 -> type = src
-            end1_el = etree.SubElement(
-                assoc_el,
-                "ownedEnd",
-                attrib={
-                    self.config.xmi_type: "uml:Property",
-                    self.config.xmi_id: end1_id,
-                    "name": f"end1_{assoc.src}",
-                    "visibility": "public",
-                    "isOrdered": "false",
-                    "isUnique": "true",
-                    "isReadOnly": "false",
-                    "aggregation": "none",
-                    "type": str(assoc.src),
-                    "association": aid,
-                },
-                nsmap=self.config.uml_nsmap,
-            )
-            add_bound_value(end1_el, "lowerValue", "1")
-            add_bound_value(end1_el, "upperValue", "1")
-            try:
-                if end1_id:
-                    self._emitted_property_ids.add(str(end1_id))
-                    self._emitted_ids.add(str(end1_id))
-            except Exception:
-                pass
-
-        if create_owned_end2:
-            # ownedEnd 2 -> type = tgt
-            end2_el = etree.SubElement(
-                assoc_el,
-                "ownedEnd",
-                attrib={
-                    self.config.xmi_type: "uml:Property",
-                    self.config.xmi_id: end2_id,
-                    "name": f"end2_{assoc.tgt}",
-                    "visibility": "public",
-                    "isOrdered": "false",
-                    "isUnique": "true",
-                    "isReadOnly": "false",
-                    "aggregation": "none",
-                    "type": str(assoc.tgt),
-                    "association": aid,
-                },
-                nsmap=self.config.uml_nsmap,
-            )
-            add_bound_value(end2_el, "lowerValue", "1")
-            add_bound_value(end2_el, "upperValue", "1")
-            try:
-                if end2_id:
-                    self._emitted_property_ids.add(str(end2_id))
-                    self._emitted_ids.add(str(end2_id))
-            except Exception:
-                pass
-
-        # Do not set 'opposite' attributes on ends to avoid conflicts during EMF load
-
-        # If any ownedEnd was created (i.e., конец не у класса), помечаем ассоциацию eAnnotation как стереотип
-        from app.config import DEFAULT_CONFIG
-        cfg_annotate = True
-        try:
-            cfg_annotate = DEFAULT_CONFIG.annotate_owned_end
-        except Exception:
-            pass
-        if cfg_annotate and (create_owned_end1 or create_owned_end2):
-            try:
-                ann = etree.SubElement(
-                    assoc_el,
-                    "eAnnotations",
-                    attrib={
-                        "source": "cpp",
-                    },
-                    nsmap=self.config.uml_nsmap,
-                )
-                etree.SubElement(
-                    ann,
-                    "details",
-                    attrib={
-                        "key": "stereotype",
-                        "value": "OwnedEnd",
-                    },
-                    nsmap=self.config.uml_nsmap,
-                )
-                etree.SubElement(
-                    ann,
-                    "details",
-                    attrib={
-                        "key": "end1",
-                        "value": "owned" if create_owned_end1 else "class",
-                    },
-                    nsmap=self.config.uml_nsmap,
-                )
-                etree.SubElement(
-                    ann,
-                    "details",
-                    attrib={
-                        "key": "end2",
-                        "value": "owned" if create_owned_end2 else "class",
-                    },
-                    nsmap=self.config.uml_nsmap,
-                )
-            except Exception:
-                pass
-
-        # Always declare memberEnd idrefs (either class-owned or the ownedEnd we just created)
         # EMF requires exactly 2 memberEnd for valid association
-        # Ensure both end IDs are valid before creating memberEnd
-        if end1_id and end2_id:
-            etree.SubElement(assoc_el, "memberEnd", attrib={self.config.xmi_idref: end1_id}, nsmap=self.config.uml_nsmap)
-            etree.SubElement(assoc_el, "memberEnd", attrib={self.config.xmi_idref: end2_id}, nsmap=self.config.uml_nsmap)
-        else:
+        # Ensure both end IDs are valid before anything is streamed out
+        if not (end1_id and end2_id):
             logger.warning(f"Skipping association {aid} due to invalid end IDs: end1={end1_id}, end2={end2_id}")
             return  # Don't create invalid association
-        try:
-            self._referenced_idrefs.add(str(end1_id))
-            self._referenced_idrefs.add(str(end2_id))
-        except Exception:
-            pass
 
-        # Write the complete association
-        self.xf.write(assoc_el)
+        cfg_annotate: bool = getattr(DEFAULT_CONFIG, "annotate_owned_end", True)
+
+        # XMI 2.1 compliant association attributes
+        with self.xf.element("packagedElement", attrib={
+            self.config.xmi_type: uml_model.association_type,
+            self.config.xmi_id: aid,
+            "name": assoc.name or "",
+            "visibility": "public"  # Default visibility for XMI 2.1
+        }):
+            if create_owned_end1:
+                # ownedEnd 1 -> type = src
+                write_owned_end(end1_id, f"end1_{assoc.src}", str(assoc.src))
+            if create_owned_end2:
+                # ownedEnd 2 -> type = tgt
+                write_owned_end(end2_id, f"end2_{assoc.tgt}", str(assoc.tgt))
+
+            # Do not set 'opposite' attributes on ends to avoid conflicts during EMF load
+
+            # If any ownedEnd was created (i.e., конец не у класса), помечаем ассоциацию eAnnotation как стереотип
+            if cfg_annotate and (create_owned_end1 or create_owned_end2):
+                with self.xf.element("eAnnotations", attrib={"source": "cpp"}):
+                    self._write_empty("details", {"key": "stereotype", "value": "OwnedEnd"})
+                    self._write_empty("details", {"key": "end1", "value": "owned" if create_owned_end1 else "class"})
+                    self._write_empty("details", {"key": "end2", "value": "owned" if create_owned_end2 else "class"})
+
+            # Always declare memberEnd idrefs (either class-owned or the ownedEnd we just created)
+            self._write_empty("memberEnd", {self.config.xmi_idref: end1_id})
+            self._write_empty("memberEnd", {self.config.xmi_idref: end2_id})
+        self._referenced_idrefs.add(str(end1_id))
+        self._referenced_idrefs.add(str(end2_id))
+
         # Track referenced type ids for post-materialization
-        try:
-            if assoc.src:
-                self._referenced_type_ids.add(str(assoc.src))
-            if assoc.tgt:
-                self._referenced_type_ids.add(str(assoc.tgt))
-        except Exception:
-            pass
+        if assoc.src:
+            self._referenced_type_ids.add(str(assoc.src))
+        if assoc.tgt:
+            self._referenced_type_ids.add(str(assoc.tgt))
 
     def get_referenced_type_ids(self) -> set[str]:
         return set(self._referenced_type_ids)
@@ -1,14 +1,16 @@
 from dataclasses import dataclass
+from typing import Final
 from .xml_meta import XmlMetaModel
 from .uml_meta import UmlMetaModel
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MetaBundle:
     xml: XmlMetaModel
     uml: UmlMetaModel
 
 
-DEFAULT_META = MetaBundle(xml=XmlMetaModel(), uml=UmlMetaModel())
+# Single shared instance; the meta-models are immutable
+DEFAULT_META: Final[MetaBundle] = MetaBundle(xml=XmlMetaModel(), uml=UmlMetaModel())
 
 
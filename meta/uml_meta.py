@@ -1,10 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict
 
 ElementType = str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UmlMetaModel:
     class_type: ElementType = "uml:Class"
     enum_type: ElementType = "uml:Enumeration"
@@ -35,8 +35,10 @@ class UmlMetaModel:
     default_aggregation: str = "none"
     default_visibility: str = "public"
 
-    def get_element_type(self, kind: str) -> ElementType:
-        mapping: Dict[str, ElementType] = {
+    _type_mapping: Dict[str, ElementType] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_type_mapping", {
             "class": self.class_type,
             "enum": self.enum_type,
             "datatype": self.datatype_type,
@@ -46,7 +48,7 @@ class UmlMetaModel:
             "union": self.class_type,
             "package": self.package_type,
             "artifact": self.artifact_type,
-        }
-        return mapping.get(kind, self.class_type)
-
+        })
 
+    def get_element_type(self, kind: str) -> ElementType:
+        return self._type_mapping.get(kind, self.class_type)
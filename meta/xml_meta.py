@@ -1,38 +1,28 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict
 
 Namespace = str
 AttributeName = str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class XmlMetaModel:
     xmi_ns: Namespace = "http://www.omg.org/XMI"
     uml_ns: Namespace = "http://www.eclipse.org/uml2/5.0.0/UML"
     notation_ns: Namespace = "http://www.eclipse.org/papyrus/notation/1.0"
 
-    @property
-    def xmi_id(self) -> AttributeName:
-        return f"{{{self.xmi_ns}}}id"
-
-    @property
-    def xmi_idref(self) -> AttributeName:
-        return f"{{{self.xmi_ns}}}idref"
-
-    @property
-    def xmi_type(self) -> AttributeName:
-        return f"{{{self.xmi_ns}}}type"
-
-    @property
-    def xmi_version(self) -> AttributeName:
-        return f"{{{self.xmi_ns}}}version"
-
-    @property
-    def uml_nsmap(self) -> Dict[str, Namespace]:
-        return {"xmi": self.xmi_ns, "uml": self.uml_ns}
-
-    @property
-    def notation_nsmap(self) -> Dict[str, Namespace]:
-        return {"notation": self.notation_ns, "xmi": self.xmi_ns}
-
-
+    # Clark-notation attribute names and namespace maps, derived once from the namespaces above
+    xmi_id: AttributeName = field(init=False, repr=False, compare=False)
+    xmi_idref: AttributeName = field(init=False, repr=False, compare=False)
+    xmi_type: AttributeName = field(init=False, repr=False, compare=False)
+    xmi_version: AttributeName = field(init=False, repr=False, compare=False)
+    uml_nsmap: Dict[str, Namespace] = field(init=False, repr=False, compare=False)
+    notation_nsmap: Dict[str, Namespace] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "xmi_id", f"{{{self.xmi_ns}}}id")
+        object.__setattr__(self, "xmi_idref", f"{{{self.xmi_ns}}}idref")
+        object.__setattr__(self, "xmi_type", f"{{{self.xmi_ns}}}type")
+        object.__setattr__(self, "xmi_version", f"{{{self.xmi_ns}}}version")
+        object.__setattr__(self, "uml_nsmap", {"xmi": self.xmi_ns, "uml": self.uml_ns})
+        object.__setattr__(self, "notation_nsmap", {"notation": self.notation_ns, "xmi": self.xmi_ns})
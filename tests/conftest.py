@@ -6,4 +6,21 @@ PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+import pytest
 
+from core.uml_model import UmlElement, ClangMetadata, ElementKind, ElementName, XmiId
+
+
+@pytest.fixture
+def make_element():
+    """Factory for minimal UmlElement instances: make_element(xmi, name=None, kind=ElementKind.CLASS)."""
+    def make(xmi: str, name: str | None = None, kind: ElementKind = ElementKind.CLASS) -> UmlElement:
+        return UmlElement(
+            xmi=XmiId(xmi),
+            name=ElementName(name or xmi),
+            kind=kind,
+            members=[],
+            clang=ClangMetadata(),
+            used_types=frozenset(),
+        )
+    return make
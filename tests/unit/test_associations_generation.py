@@ -254,3 +254,24 @@ def test_getter_only_non_field_both_owned():
         assert len(owned) == 2
 
 
+def test_referenced_type_stubs_do_not_duplicate_property_ids(monkeypatch):
+    from app.config import DEFAULT_CONFIG
+    monkeypatch.setattr(DEFAULT_CONFIG, "emit_referenced_type_stubs", True)
+    a = _mk_class("id_A", "ns::A", members=[("b", "ns::B")])
+    b = _mk_class("id_B", "ns::B")
+    model = UmlModel(
+        elements={a.xmi: a, b.xmi: b},
+        associations=[UmlAssociation(src=a.xmi, tgt=b.xmi, name="b", _end1_id=stable_id("id_A:attr:b"), _end2_id=XmiId("id_B_end"))],
+        dependencies=[],
+        generalizations=[],
+        name_to_xmi={a.name: a.xmi, b.name: b.xmi},
+    )
+
+    with tempfile.TemporaryDirectory() as td:
+        out_uml = os.path.join(td, "m.uml")
+        XmiGenerator(model).write(out_uml, "test", pretty=True)
+        root = _parse(out_uml)
+        XMI = 'http://www.omg.org/XMI'
+        ids = [el.get(f'{{{XMI}}}id') for el in root.xpath('//*[@xmi:id]', namespaces={'xmi': XMI})]
+        assert len(ids) == len(set(ids))
+        assert stable_id("id_A:attr:b") in ids
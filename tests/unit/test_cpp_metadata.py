@@ -247,6 +247,17 @@ class TestBidirectionalConverter:
         assert len(template_data.uml_parameters) == 2
         assert not template_data.has_corrupted_data
     
+    def test_raw_data_preservation_is_optional(self):
+        """Test that the raw JSON copy is only kept when requested"""
+        raw = {"name": "Widget", "namespace": "ui", "source_location": {"file": "w.h", "line": 3, "column": 1}}
+        
+        kept = BidirectionalConverter().parse_cpp_element(raw)
+        assert kept.cpp_metadata.original_data == raw
+        
+        dropped = BidirectionalConverter(preserve_raw_data=False).parse_cpp_element(raw)
+        assert dropped.cpp_metadata.original_data == {}
+        assert dropped.cpp_metadata.source_location.file == "w.h"
+    
     def test_parse_corrupted_cpp_element(self):
         """Test parsing of corrupted C++ element data"""
         corrupted_data = {
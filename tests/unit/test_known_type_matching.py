@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Tests for CppTypeParser.match_known_types_from_parsed with list and set inputs.
+"""
+
+from adapters.clang_uml import CppTypeParser
+
+
+def test_ordered_known_names_keep_first_match():
+    tokens = CppTypeParser.extract_all_type_identifiers("std::unique_ptr<Foo, Deleter>")
+    known = ["ns::Foo", "Foo", "Deleter"]
+    assert CppTypeParser.match_known_types_from_parsed(tokens, known) == ["ns::Foo", "Deleter"]
+    assert CppTypeParser.match_known_types_from_parsed(tokens, tuple(known)) == ["ns::Foo", "Deleter"]
+
+
+def test_set_known_names_prefer_exact_match():
+    tokens = CppTypeParser.extract_all_type_identifiers("std::unique_ptr<Foo, Deleter>")
+    known = {"ns::Foo", "Foo", "Deleter"}
+    assert CppTypeParser.match_known_types_from_parsed(tokens, known) == ["Foo", "Deleter"]
+    assert CppTypeParser.match_known_types_from_parsed(tokens, frozenset(known)) == ["Foo", "Deleter"]
+
+
+def test_template_base_matching():
+    tokens = CppTypeParser.extract_all_type_identifiers("std::map<std::string, std::vector<ns::B>>")
+    known = ["std::map<K, V>", "ns::B"]
+    assert CppTypeParser.match_known_types_from_parsed(tokens, known) == ["std::map<K, V>", "ns::B"]
+
+
+def test_set_exact_matches_do_not_iterate_known_names():
+    class _NoIterSet(set):
+        def __iter__(self):
+            raise AssertionError("exact matches must not list known names")
+
+    tokens = [{"name": "Foo"}, {"name": "Bar"}]
+    assert CppTypeParser.match_known_types_from_parsed(tokens, _NoIterSet({"Foo", "Bar"})) == ["Foo", "Bar"]
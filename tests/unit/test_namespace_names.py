@@ -143,5 +143,41 @@ def test_namespace_names():
         except FileNotFoundError:
             pass
 
+def test_element_kinds_without_visitor_are_written_as_classes():
+    """Typedef and interface elements fall back to uml:Class."""
+    elements = {}
+    for xmi, name, kind in (("id_enum", "ns::Color", ElementKind.ENUM),
+                            ("id_typedef", "ns::Handle", ElementKind.TYPEDEF),
+                            ("id_iface", "ns::IShape", ElementKind.INTERFACE)):
+        elements[XmiId(xmi)] = UmlElement(xmi=XmiId(xmi), name=ElementName(name), kind=kind, members=[],
+                                          clang=ClangMetadata(), used_types=frozenset())
+    model = UmlModel(elements=elements, associations=[], dependencies=[], generalizations=[],
+                     name_to_xmi={e.name: e.xmi for e in elements.values()})
+
+    with tempfile.TemporaryDirectory() as td:
+        output_path = os.path.join(td, "kinds.uml")
+        XmiGenerator(model).write(output_path, "KindsTest")
+        root = ET.parse(output_path).getroot()
+        types = {el.get('{http://www.omg.org/XMI}id'): el.get('{http://www.omg.org/XMI}type')
+                 for el in root.iter('packagedElement')}
+        assert types["id_enum"] == "uml:Enumeration"
+        assert types["id_typedef"] == "uml:Class"
+        assert types["id_iface"] == "uml:Class"
+
+def test_flat_model_namespace_tree_keeps_element_order():
+    """Models without qualified names get a root-only tree in element order."""
+    elements = {}
+    for xmi, name in (("id_b", "B"), ("id_a", "A"), ("id_c", "C")):
+        elements[XmiId(xmi)] = UmlElement(xmi=XmiId(xmi), name=ElementName(name), kind=ElementKind.CLASS, members=[],
+                                          clang=ClangMetadata(), used_types=frozenset())
+    model = UmlModel(elements=elements, associations=[], dependencies=[], generalizations=[],
+                     name_to_xmi={e.name: e.xmi for e in elements.values()},
+                     namespace_packages={"ns": XmiId("id_ns")})
+
+    tree = XmiGenerator(model).namespace_tree
+    assert list(tree) == ["ns", "B", "A", "C"]
+    assert tree["ns"].xmi_id == "id_ns" and not tree["ns"].children
+    assert [tree[n].xmi for n in ("B", "A", "C")] == ["id_b", "id_a", "id_c"]
+
 if __name__ == "__main__":
     test_namespace_names()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Unit tests for NotationWriter output modes (pretty tree vs compact streaming).
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import pytest
+from lxml import etree
+
+from app.config import DiagramConfig
+
+from core.uml_model import ElementKind
+from gen.notation.writer import NotationWriter
+
+
+def _elements(make_element) -> dict:
+    els = [
+        make_element("id_A", "ns::A", ElementKind.CLASS),
+        make_element("id_E", "ns::E", ElementKind.ENUM),
+        make_element("id_D", "D", ElementKind.DATATYPE),
+    ]
+    return {e.xmi: e for e in els}
+
+
+def test_compact_notation_matches_pretty_output(make_element):
+    with tempfile.TemporaryDirectory() as td:
+        pretty_path = os.path.join(td, "pretty.notation")
+        compact_path = os.path.join(td, "compact.notation")
+        NotationWriter(_elements(make_element), pretty_path).write()
+        NotationWriter(_elements(make_element), compact_path, compact=True).write()
+
+        parser = etree.XMLParser(remove_blank_text=True)
+        pretty_root = etree.parse(pretty_path, parser).getroot()
+        compact_root = etree.parse(compact_path, parser).getroot()
+        assert etree.tostring(pretty_root) == etree.tostring(compact_root)
+
+        children = list(compact_root)
+        assert [c.get("type") for c in children] == ["Class", "Enumeration", "DataType"]
+        assert [c.get("elementRef") for c in children] == ["id_A", "id_E", "id_D"]
+        # Compact mode does not indent
+        with open(compact_path, "rb") as fh:
+            assert b"\n  <children" not in fh.read()
+
+
+def test_compact_notation_escapes_attribute_values(make_element):
+    els = {e.xmi: e for e in (make_element('id_"a"&<b>', "A"), make_element("id_tab\there", "B"))}
+    with tempfile.TemporaryDirectory() as td:
+        pretty_path = os.path.join(td, "pretty.notation")
+        compact_path = os.path.join(td, "compact.notation")
+        NotationWriter(els, pretty_path).write()
+        NotationWriter(els, compact_path, compact=True).write()
+
+        parser = etree.XMLParser(remove_blank_text=True)
+        compact_root = etree.parse(compact_path, parser).getroot()
+        assert etree.tostring(etree.parse(pretty_path, parser).getroot()) == etree.tostring(compact_root)
+        assert [c.get("elementRef") for c in compact_root] == ['id_"a"&<b>', "id_tab\there"]
+
+
+def test_compact_notation_is_c14n_equal_to_pretty_tree(make_element):
+    with tempfile.TemporaryDirectory() as td:
+        pretty_path = os.path.join(td, "pretty.notation")
+        compact_path = os.path.join(td, "compact.notation")
+        NotationWriter(_elements(make_element), pretty_path).write()
+        NotationWriter(_elements(make_element), compact_path, config=DiagramConfig(compact=True)).write()
+
+        parser = etree.XMLParser(remove_blank_text=True)
+        expected = etree.tostring(etree.parse(pretty_path, parser), method="c14n")
+        assert etree.tostring(etree.parse(compact_path), method="c14n") == expected
+
+
+def test_compact_notation_rejects_control_characters(make_element):
+    els = {e.xmi: e for e in (make_element("id_\x01", "A"),)}
+    with tempfile.TemporaryDirectory() as td:
+        with pytest.raises(ValueError):
+            NotationWriter(els, os.path.join(td, "compact.notation"), compact=True).write()
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Unit tests for stable id hashing and the legacy SHA-1 id switch.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from utils.ids import stable_id, stable_id_bytes, use_legacy_ids
+
+
+def test_legacy_ids_reproduce_sha1_ids():
+    assert stable_id("ns::A") == "id_" + hashlib.blake2b(b"ns::A", digest_size=8).hexdigest()
+    try:
+        use_legacy_ids()
+        # The memo must not hand back ids computed before the switch
+        assert stable_id("ns::A") == "id_" + hashlib.sha1(b"ns::A").hexdigest()[:16]
+        assert stable_id_bytes(b"ns::A:node") == "id_" + hashlib.sha1(b"ns::A:node").hexdigest()[:16]
+    finally:
+        use_legacy_ids(False)
+    assert stable_id("ns::A") == "id_" + hashlib.blake2b(b"ns::A", digest_size=8).hexdigest()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Unit tests for UmlModel query helpers and their explicitly built indexes.
+"""
+
+from __future__ import annotations
+
+from core.uml_model import UmlModel, UmlAssociation, UmlGeneralization, ElementKind, XmiId
+
+
+def _model(make_element) -> UmlModel:
+    elements = {e.xmi: e for e in (make_element("a"), make_element("b"), make_element("c"), make_element("e", kind=ElementKind.ENUM))}
+    return UmlModel(
+        elements=elements,
+        associations=[UmlAssociation(src=XmiId("a"), tgt=XmiId("b")), UmlAssociation(src=XmiId("c"), tgt=XmiId("a"))],
+        dependencies=[],
+        generalizations=[
+            UmlGeneralization(child_id=XmiId("b"), parent_id=XmiId("a")),
+            UmlGeneralization(child_id=XmiId("c"), parent_id=XmiId("b")),
+        ],
+        name_to_xmi={e.name: e.xmi for e in elements.values()},
+    )
+
+
+def _ids(elements) -> list:
+    return [str(e.xmi) for e in elements]
+
+
+def test_queries_use_relations(make_element):
+    model = _model(make_element)
+    assert _ids(model.get_elements_by_kind(ElementKind.CLASS)) == ["a", "b", "c"]
+    assert _ids(model.get_elements_by_kind(ElementKind.ENUM)) == ["e"]
+    assert _ids(model.get_parent_elements(XmiId("c"))) == ["b"]
+    assert _ids(model.get_child_elements(XmiId("a"))) == ["b"]
+    assert sorted(_ids(model.get_associated_elements(XmiId("a")))) == ["b", "c"]
+    assert model.get_associated_elements(XmiId("e")) == []
+
+
+def test_indexes_follow_model_growth(make_element):
+    model = _model(make_element)
+    assert model.get_child_elements(XmiId("c")) == []
+    model.elements[XmiId("d")] = make_element("d")
+    model.generalizations.append(UmlGeneralization(child_id=XmiId("d"), parent_id=XmiId("c")))
+    assert _ids(model.get_child_elements(XmiId("c"))) == ["d"]
+    assert _ids(model.get_elements_by_kind(ElementKind.CLASS)) == ["a", "b", "c", "d"]
+    model.associations = []
+    assert model.get_associated_elements(XmiId("a")) == []
+
+
+def test_queries_follow_in_place_mutation(make_element):
+    model = _model(make_element)
+    assert _ids(model.get_parent_elements(XmiId("b"))) == ["a"]
+    model.elements[XmiId("a")] = make_element("a", kind=ElementKind.ENUM)
+    model.generalizations[0] = UmlGeneralization(child_id=XmiId("a"), parent_id=XmiId("b"))
+    assert _ids(model.get_elements_by_kind(ElementKind.ENUM)) == ["a", "e"]
+    assert model.get_parent_elements(XmiId("b")) == []
+    assert _ids(model.get_parent_elements(XmiId("a"))) == ["b"]
+
+
+def test_built_indexes_answer_like_scans_until_invalidated(make_element):
+    model = _model(make_element)
+    model.build_indexes()
+    assert _ids(model.get_elements_by_kind(ElementKind.CLASS)) == ["a", "b", "c"]
+    assert _ids(model.get_child_elements(XmiId("a"))) == ["b"]
+    assert sorted(_ids(model.get_associated_elements(XmiId("a")))) == ["b", "c"]
+    assert _ids(model.get_inheritance_hierarchy(XmiId("c"))) == ["c", "b", "a"]
+    model.elements[XmiId("a")] = make_element("a", kind=ElementKind.ENUM)
+    model.invalidate_indexes()
+    assert _ids(model.get_elements_by_kind(ElementKind.ENUM)) == ["a", "e"]
+
+
+def test_inheritance_hierarchy_follows_first_parent_and_stops_on_cycle(make_element):
+    model = _model(make_element)
+    assert _ids(model.get_inheritance_hierarchy(XmiId("c"))) == ["c", "b", "a"]
+    model.generalizations.append(UmlGeneralization(child_id=XmiId("a"), parent_id=XmiId("c")))
+    assert _ids(model.get_inheritance_hierarchy(XmiId("c"))) == ["c", "b", "a"]
+    assert model.get_inheritance_hierarchy(XmiId("missing")) == []
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Unit tests for dependency and generalization emission in XmiGenerator.
+"""
+
+from __future__ import annotations
+
+import collections
+import os
+import tempfile
+from lxml import etree
+
+from core.uml_model import UmlModel, UmlGeneralization
+from gen.xmi.generator import XmiGenerator
+
+XMI = 'http://www.omg.org/XMI'
+
+
+def test_repeated_dependencies_and_generalizations_are_written_once(make_element):
+    a, b = make_element("id_A", "ns::A"), make_element("id_B", "ns::B")
+    model = UmlModel(
+        elements={a.xmi: a, b.xmi: b},
+        associations=[],
+        dependencies=[("ns::A", "ns::B"), ("ns::A", "ns::B")],
+        generalizations=[
+            UmlGeneralization(child_id=a.xmi, parent_id=b.xmi),
+            UmlGeneralization(child_id=a.xmi, parent_id=b.xmi),
+        ],
+        name_to_xmi={a.name: a.xmi, b.name: b.xmi},
+    )
+
+    with tempfile.TemporaryDirectory() as td:
+        out_uml = os.path.join(td, "m.uml")
+        XmiGenerator(model).write(out_uml, "test")
+        root = etree.parse(out_uml).getroot()
+        deps = [el for el in root.iter("packagedElement") if el.get(f'{{{XMI}}}type') == "uml:Dependency"]
+        assert [(d.get("client"), d.get("supplier")) for d in deps] == [("id_A", "id_B")]
+        assert [g.get("general") for g in root.iter("generalization")] == ["id_B"]
+        ids = collections.Counter(el.get(f'{{{XMI}}}id') for el in root.iter() if el.get(f'{{{XMI}}}id'))
+        assert all(count == 1 for count in ids.values())
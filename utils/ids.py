@@ -2,18 +2,46 @@ from __future__ import annotations
 
 import hashlib
 import uuid
+from functools import lru_cache
 
 from uml_types import IdString, HashString
 
+_blake2b = hashlib.blake2b
+_sha1 = hashlib.sha1
+# Truncated SHA-1 ids as generated before the switch to BLAKE2b; see use_legacy_ids()
+_legacy_ids = False
+
 
 def xid() -> IdString:
     return "id_" + uuid.uuid4().hex
 
 
+# The same inputs are hashed repeatedly (e.g. member property ids are computed
+# in the association pre-pass and again when the owning class is written).
+# Keys that are hashed exactly once per run (operation, dependency and diagram
+# node ids) go through stable_id_bytes() so they do not grow the cache. The cache is
+# unbounded on purpose: the association pre-pass and the visit pass are far apart, so
+# an LRU bound below the model's key count would evict every entry before its reuse.
+# XmiGenerator.write() clears it when a run finishes, which keeps memory per model.
+@lru_cache(maxsize=None)
 def stable_id(s: str) -> HashString:
-    return "id_" + hashlib.sha1(s.encode("utf-8")).hexdigest()[:16]
+    return stable_id_bytes(s.encode("utf-8"))
+
+
+def stable_id_bytes(b: bytes) -> HashString:
+    """stable_id() for already UTF-8 encoded input; not memoized, meant for one-off ids with a shared prefix."""
+    if _legacy_ids:
+        return "id_" + _sha1(b).hexdigest()[:16]
+    return "id_" + _blake2b(b, digest_size=8).hexdigest()
+
+
+def use_legacy_ids(enabled: bool = True) -> None:
+    """Generate the truncated SHA-1 ids of earlier releases, so regenerated files keep the ids existing diagrams link to."""
+    global _legacy_ids
+    _legacy_ids = enabled
+    stable_id.cache_clear()
 
 
-__all__ = ["xid", "stable_id"]
+__all__ = ["xid", "stable_id", "stable_id_bytes", "use_legacy_ids"]
 
 